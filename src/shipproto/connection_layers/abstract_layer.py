@@ -1,2 +1,12 @@
 class AbortConnectionException(Exception):
-    pass
+    """Raised when the SHIP connection has to be aborted.
+
+    The message may be given as a %-style format string followed by its arguments, like a
+    logging call. It is only formatted when the exception is converted to a string, so raising
+    the exception does not pay for building a message which is often never shown.
+    """
+
+    def __str__(self) -> str:
+        if len(self.args) > 1 and isinstance(self.args[0], str):
+            return self.args[0] % self.args[1:]
+        return super().__str__()
@@ -5,11 +5,12 @@ import logging
 from enum import IntEnum
 
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
-from shipproto.finish_first import FinishFirst
-from shipproto.websocket import Websocket
+from shipproto.websocket import Websocket, recv_bytes
 
 log = logging.getLogger("ship")
 
+_CMI_MESSAGE = b"\x00\x00"
+
 
 class CMIClientStates(IntEnum):
     CMI_INIT_START = 0
@@ -32,19 +33,14 @@ class AbstractCMILayer:
         self.websocket = websocket
 
     async def receive_cmi_message(self) -> bytes:
-        msg = await self.websocket.recv()
-
-        if isinstance(msg, str):
-            msg = msg.encode()
-
-        return msg
+        return await recv_bytes(self.websocket)
 
     async def send_cmi_message(self):
-        await self.websocket.send(b"\x00\x00")
+        await self.websocket.send(_CMI_MESSAGE)
 
     @staticmethod
     def evaluate_cmi_message(cmi_msg: bytes) -> bool:
-        if len(cmi_msg) >= 2 and cmi_msg[0:2] == b"\x00\x00":
+        if cmi_msg.startswith(_CMI_MESSAGE):
             return True
         else:
             raise AbortConnectionException()
@@ -62,23 +58,16 @@ class CMILayerClient(AbstractCMILayer):
 
         self.current_state = CMIClientStates.CMI_STATE_CLIENT_WAIT
 
-        results = await FinishFirst(
-            {
-                "cmi_message": self.receive_cmi_message(),
-                "cmi_timeout_timer": asyncio.sleep(self.CMI_TIMEOUT_SECONDS),
-            }
-        ).run()
-
-        if "cmi_timeout_timer" in results:
+        try:
+            cmi_msg = await asyncio.wait_for(
+                self.receive_cmi_message(), timeout=self.CMI_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
             log.debug("CMI timeout timer triggered.")
             raise AbortConnectionException()
-        elif "cmi_message" in results:
-            self.current_state = CMIClientStates.CMI_STATE_CLIENT_EVALUATE
-            cmi_msg: bytes = results["cmi_message"]
-            self.evaluate_cmi_message(cmi_msg)
-        else:
-            log.error("This should not happen. %s", results)
-            raise AbortConnectionException()
+
+        self.current_state = CMIClientStates.CMI_STATE_CLIENT_EVALUATE
+        self.evaluate_cmi_message(cmi_msg)
 
 
 class CMILayerServer(AbstractCMILayer):
@@ -89,22 +78,15 @@ class CMILayerServer(AbstractCMILayer):
         self.current_state = CMIServerStates.CMI_STATE_SERVER_WAIT
 
     async def run(self):
-        results = await FinishFirst(
-            {
-                "cmi_message": self.receive_cmi_message(),
-                "cmi_timeout_timer": asyncio.sleep(self.CMI_TIMEOUT_SECONDS),
-            }
-        ).run()
-
-        if "cmi_timeout_timer" in results:
+        try:
+            cmi_msg = await asyncio.wait_for(
+                self.receive_cmi_message(), timeout=self.CMI_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
             log.debug("CMI timeout timer triggered.")
             raise AbortConnectionException()
-        elif "cmi_message" in results:
-            log.debug("Received CMI message.")
-            self.current_state = CMIServerStates.CMI_STATE_SERVER_EVALUATE
-            await self.send_cmi_message()
-            cmi_msg: bytes = results["cmi_message"]
-            self.evaluate_cmi_message(cmi_msg)
-        else:
-            log.error("This should not happen. %s", results)
-            raise AbortConnectionException()
+
+        log.debug("Received CMI message.")
+        self.current_state = CMIServerStates.CMI_STATE_SERVER_EVALUATE
+        await self.send_cmi_message()
+        self.evaluate_cmi_message(cmi_msg)
@@ -1,17 +1,17 @@
 """Connection State "Hello" layer."""
 import datetime
-import json
 import logging
 from dataclasses import dataclass
 from datetime import timedelta
-from enum import IntEnum, Enum
-from typing import Dict, Any, Optional
+from enum import IntEnum, IntFlag, Enum
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple
 
+from shipproto import json_codec
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
 from shipproto.finish_first import FinishFirst
 from shipproto.timer import AsyncTimer
 from shipproto.trust_manager import TrustManager
-from shipproto.websocket import Websocket
+from shipproto.websocket import Websocket, recv_bytes
 
 log = logging.getLogger("ship")
 
@@ -26,19 +26,34 @@ class CSHStates(IntEnum):
     SME_HELLO_OK = 6
 
     def is_pending(self) -> bool:
-        return self in [
-            CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT,
-            CSHStates.SME_HELLO_STATE_PENDING_LISTEN,
-            CSHStates.SME_HELLO_STATE_PENDING_INIT,
-        ]
+        return bool((1 << self) & _PENDING_STATES_MASK)
 
     def is_ready(self) -> bool:
-        return self in [
-            CSHStates.SME_HELLO_STATE_READY_TIMEOUT,
-            CSHStates.SME_HELLO_STATE_READY_LISTEN,
-            CSHStates.SME_HELLO_STATE_READY_INIT,
-            CSHStates.SME_HELLO_OK,
-        ]
+        return bool((1 << self) & _READY_STATES_MASK)
+
+
+# Bit n is set when the CSHStates member with value n belongs to the group.
+_PENDING_STATES_MASK = (
+    (1 << CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT)
+    | (1 << CSHStates.SME_HELLO_STATE_PENDING_LISTEN)
+    | (1 << CSHStates.SME_HELLO_STATE_PENDING_INIT)
+)
+_READY_STATES_MASK = (
+    (1 << CSHStates.SME_HELLO_STATE_READY_TIMEOUT)
+    | (1 << CSHStates.SME_HELLO_STATE_READY_LISTEN)
+    | (1 << CSHStates.SME_HELLO_STATE_READY_INIT)
+    | (1 << CSHStates.SME_HELLO_OK)
+)
+
+
+class _CSHInput(IntFlag):
+    """The inputs the CSH state machine waits on, combined into one flag of those that finished."""
+
+    CSH_MESSAGE = 1
+    WAIT_FOR_READY_TIMER = 2
+    SEND_PROLONGATION_TIMER = 4
+    PROLONGATION_REQUEST_REPLY_TIMER = 8
+    RECEIVE_TRUST = 16
 
 
 class CSHPhases(Enum):
@@ -47,7 +62,30 @@ class CSHPhases(Enum):
     ABORTED = "aborted"
 
 
-@dataclass
+def _parse_waiting(value: Any) -> timedelta:
+    return timedelta(milliseconds=int(value))
+
+
+def _as_is(value: Any) -> Any:
+    return value
+
+
+_ONE_MILLISECOND = timedelta(milliseconds=1)
+
+# The enum values need no escaping, so their JSON items are encoded once.
+_PHASE_ITEMS = {phase: b'{"phase":"%s"}' % phase.value.encode() for phase in CSHPhases}
+
+# Maps the key of a field in a CSH message to the dataclass field name and a parser of its value.
+_FieldParsers = Dict[str, Tuple[str, Callable[[Any], Any]]]
+
+_CSH_FIELDS: _FieldParsers = {
+    "phase": ("phase", CSHPhases),
+    "waiting": ("waiting", _parse_waiting),
+    "prolongationRequest": ("prolongation_request", _as_is),
+}
+
+
+@dataclass(slots=True)
 class CSHMessage:
     phase: CSHPhases
     waiting: Optional[timedelta]
@@ -57,18 +95,30 @@ class CSHMessage:
         items = [{"phase": self.phase.value}]
 
         if self.waiting is not None:
-            items.append({"waiting": round(self.waiting.total_seconds() * 1000)})
+            items.append({"waiting": max(0, self.waiting // _ONE_MILLISECOND)})
 
         if self.prolongation_request is not None:
             items.append({"prolongationRequest": self.prolongation_request})
 
         return {"connectionHello": items}
 
+    def to_wire(self) -> bytes:
+        wire = b'{"connectionHello":[' + _PHASE_ITEMS[self.phase]
+
+        if self.waiting is not None:
+            # A timer which just expired has a slightly negative time left, which floors to -1.
+            wire += b',{"waiting":%d}' % max(0, self.waiting // _ONE_MILLISECOND)
+
+        if self.prolongation_request is not None:
+            wire += b',{"prolongationRequest":%s}' % (
+                b"true" if self.prolongation_request else b"false"
+            )
+
+        return wire + b"]}"
+
     @staticmethod
     def from_json(csh_json_msg: Dict[str, Any]) -> "CSHMessage":
-        phase = None
-        waiting = None
-        prolongation_request = None
+        fields: Dict[str, Any] = {"phase": None, "waiting": None, "prolongation_request": None}
 
         try:
             for item in csh_json_msg["connectionHello"]:
@@ -82,26 +132,31 @@ class CSHMessage:
                     raise AbortConnectionException
 
                 item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "phase":
-                    phase = CSHPhases(value)
-                elif key == "waiting":
-                    waiting = datetime.timedelta(milliseconds=int(value))
-                elif key == "prolongationRequest":
-                    prolongation_request = value
-                else:
+                key, value = next(iter(item.items()))
+                field = _CSH_FIELDS.get(key)
+                if field is None:
                     log.error("Unexpected field %s in CSH message %s", key, csh_json_msg)
                     raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
+
+                field_name, parse_value = field
+                fields[field_name] = parse_value(value)
+        except (KeyError, ValueError, IndexError, TypeError, AttributeError):
             log.error("Could not parse CSH message after parsing to JSON: %s", csh_json_msg)
             raise AbortConnectionException
 
-        if phase is None:
+        if fields["phase"] is None:
             log.error("Missing required field phase in CSH message %s", csh_json_msg)
             raise AbortConnectionException
 
-        return CSHMessage(phase, waiting, prolongation_request)
+        return CSHMessage(**fields)
+
+
+_CSH_PROLONGATION_REQUEST_FRAME = (
+    b"\x01" + CSHMessage(phase=CSHPhases.PENDING, waiting=None, prolongation_request=True).to_wire()
+)
+_CSH_ABORT_FRAME = (
+    b"\x01" + CSHMessage(phase=CSHPhases.ABORTED, waiting=None, prolongation_request=None).to_wire()
+)
 
 
 class CSHLayer:
@@ -123,6 +178,10 @@ class CSHLayer:
     _previously_received_message: Optional[CSHMessage]
     _other_side_is_ready: bool
 
+    # State the machine was in before the current one, a pending timeout returns to it.
+    _previous_state: CSHStates
+    _state_handlers: Dict[CSHStates, Callable[[], Awaitable[bool]]]
+
     def __init__(self, websocket: Websocket, trust_manager: TrustManager, remote_ski: str):
         self._websocket = websocket
         self._trust_manager = trust_manager
@@ -140,35 +199,52 @@ class CSHLayer:
         self._previously_received_message = None
         self._other_side_trusts_us = False
 
+        self._previous_state = self._current_state
+        self._state_handlers = {
+            CSHStates.SME_HELLO_STATE_READY_INIT: self._handle_ready_init,
+            CSHStates.SME_HELLO_STATE_READY_LISTEN: self._handle_ready_listen,
+            CSHStates.SME_HELLO_STATE_READY_TIMEOUT: self._handle_ready_timeout,
+            CSHStates.SME_HELLO_STATE_PENDING_INIT: self._handle_pending_init,
+            CSHStates.SME_HELLO_STATE_PENDING_LISTEN: self._handle_pending_listen,
+            CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT: self._handle_pending_timeout,
+        }
+
     async def receive_csh_message(self) -> CSHMessage:
-        msg = await self._websocket.recv()
+        msg = await recv_bytes(self._websocket)
 
         if len(msg) == 0:
             log.error("Received an empty CSH message.")
             raise AbortConnectionException()
 
-        msg_type = msg[0]
-
-        if isinstance(msg_type, str):
-            msg_type = msg_type.encode()
-
-        if msg_type != 1 and msg_type != b"\x01":
-            log.error("CSH message expected with message type 1, received %s", msg_type)
+        if msg[0] != 0x01:
+            log.error("CSH message expected with message type 1, received %s", msg[0])
             raise AbortConnectionException()
 
         try:
-            msg_value = json.loads(msg[1:])
-        except json.JSONDecodeError:
+            msg_value = json_codec.loads(msg[1:])
+        except json_codec.JSONDecodeError:
             log.error("Could not parse CSH message value as json. Received %s", msg[1:])
             raise AbortConnectionException()
 
+        if not isinstance(msg_value, dict):
+            log.error("CSH message value is not a JSON object. Received %s", msg[1:])
+            raise AbortConnectionException()
+
         message = CSHMessage.from_json(msg_value)
-        log.debug("Received CSH message %s", message)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received CSH message %s", message)
         return message
 
     async def send_csh_message(self, message: CSHMessage) -> None:
-        log.debug("Sending CSH message %s", message)
-        await self._websocket.send(b"\x01" + json.dumps(message.to_json()).encode())
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending CSH message %s", message)
+        await self._websocket.send(b"\x01" + message.to_wire())
+
+    async def send_raw_csh_frame(self, frame: bytes) -> None:
+        """Send a CSH frame which is already serialized, including the message type byte."""
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending CSH frame %s", frame)
+        await self._websocket.send(frame)
 
     async def send_sme_hello_update_message(self) -> None:
         if self._current_state.is_ready():
@@ -176,9 +252,9 @@ class CSHLayer:
         else:
             phase = CSHPhases.PENDING
 
-        wait_for_ready_left = self._wait_for_ready_timer.time_left()
+        completed, wait_for_ready_left = self._wait_for_ready_timer.snapshot()
         waiting = None
-        if not await self._wait_for_ready_timer.has_completed() and wait_for_ready_left is not None:
+        if not completed and wait_for_ready_left is not None:
             waiting = datetime.timedelta(seconds=wait_for_ready_left)
 
         message = CSHMessage(phase=phase, waiting=waiting, prolongation_request=None)
@@ -199,29 +275,36 @@ class CSHLayer:
 
     async def decide_next_input(self) -> Optional[CSHMessage]:
         finishes = {
-            "csh_message": self.receive_csh_message(),
-            "wait_for_ready_timer": self._wait_for_ready_timer.wait_until_completed(),
-            "send_prolongation_timer": self._send_prolongation_timer.wait_until_completed(),
-            "prolongation_request_reply_timer": self._prolongation_request_reply_timer.wait_until_completed(),
+            _CSHInput.CSH_MESSAGE: self.receive_csh_message(),
+            _CSHInput.WAIT_FOR_READY_TIMER: self._wait_for_ready_timer.wait_until_completed(),
+            _CSHInput.SEND_PROLONGATION_TIMER: self._send_prolongation_timer.wait_until_completed(),
+            _CSHInput.PROLONGATION_REQUEST_REPLY_TIMER: (
+                self._prolongation_request_reply_timer.wait_until_completed()
+            ),
         }
         if self._current_state.is_pending():
-            finishes["receive_trust"] = self._trust_manager.wait_to_trust(self._remote_ski)
+            finishes[_CSHInput.RECEIVE_TRUST] = self._trust_manager.wait_to_trust(self._remote_ski)
 
         result = await FinishFirst(finishes).run()
+        finished = _CSHInput(0)
+        for finished_input in result:
+            finished |= finished_input
 
         message = None
-        if "wait_for_ready_timer" in result:
+        if finished & _CSHInput.WAIT_FOR_READY_TIMER:
             log.debug("Wait_for_ready_timer expired")
             if self._current_state.is_ready():
                 self._current_state = CSHStates.SME_HELLO_STATE_READY_TIMEOUT
             elif self._current_state.is_pending():
                 self._current_state = CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT
-        elif "send_prolongation_timer" in result or "prolongation_request_reply_timer" in result:
+        elif finished & (
+            _CSHInput.SEND_PROLONGATION_TIMER | _CSHInput.PROLONGATION_REQUEST_REPLY_TIMER
+        ):
             log.debug("send_prolongation_timer or prolongation_request_reply_timer expired")
             if self._current_state.is_ready():
                 raise RuntimeError("State should not be ready, something happened.")
             self._current_state = CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT
-        elif "receive_trust" in result:
+        elif finished & _CSHInput.RECEIVE_TRUST:
             log.debug("Received trust for remote %s.", self._remote_ski)
             self._send_prolongation_timer.cancel()
             self._prolongation_request_reply_timer.cancel()
@@ -231,139 +314,148 @@ class CSHLayer:
                 self._current_state = CSHStates.SME_HELLO_STATE_READY_LISTEN
             await self.send_sme_hello_update_message()
 
-        if "csh_message" in result:
-            message: CSHMessage = result["csh_message"]
+        if finished & _CSHInput.CSH_MESSAGE:
+            message: CSHMessage = result[_CSHInput.CSH_MESSAGE]
             self._previously_received_message = message
             if message.phase == CSHPhases.READY:
                 self._other_side_trusts_us = True
 
         return message
 
+    async def _handle_ready_init(self) -> bool:
+        self._wait_for_ready_timer.start(self.CSH_TIMEOUT_T_HELLO_INIT)
+        self._send_prolongation_timer.cancel()
+        self._prolongation_request_reply_timer.cancel()
+        await self.send_sme_hello_update_message()
+        self._current_state = CSHStates.SME_HELLO_STATE_READY_LISTEN
+        return False
+
+    async def _handle_ready_listen(self) -> bool:
+        message = await self.decide_next_input()
+
+        if message:
+            if message.phase == CSHPhases.READY:
+                log.debug(
+                    "Received READY from remote while local is ready. Transition to HELLO_OK."
+                )
+                self._current_state = CSHStates.SME_HELLO_OK
+            elif message.phase == CSHPhases.PENDING:
+                log.debug("Received PENDING")
+                if message.prolongation_request:
+                    await self.decide_incoming_prolongation_request(message)
+                    await self.send_sme_hello_update_message()
+            elif message.phase == CSHPhases.ABORTED:
+                log.debug("Received ABORTED")
+                return True
+        return False
+
+    async def _handle_ready_timeout(self) -> bool:
+        return True
+
+    async def _handle_pending_init(self) -> bool:
+        self._wait_for_ready_timer.start(self.CSH_TIMEOUT_T_HELLO_INIT)
+        self._send_prolongation_timer.cancel()
+        self._prolongation_request_reply_timer.cancel()
+        await self.send_sme_hello_update_message()
+        self._current_state = CSHStates.SME_HELLO_STATE_PENDING_LISTEN
+        return False
+
+    async def _handle_pending_listen(self) -> bool:
+        message = await self.decide_next_input()
+
+        if message:
+            log.debug("Received message while PENDING_LISTEN.")
+            if message.phase == CSHPhases.READY and message.waiting is None:
+                log.error("Missing waiting field in message. Aborting.")
+                return True
+            elif (message.phase == CSHPhases.READY and message.waiting) or (
+                message.phase == CSHPhases.PENDING
+                and message.waiting
+                and message.prolongation_request is None
+            ):
+                log.debug("Remote is READY and waiting. Prolongation request was accepted.")
+
+                self._prolongation_request_reply_timer.reset()
+                if message.phase == CSHPhases.READY and message.waiting:
+                    self._wait_for_ready_timer.cancel()
+
+                if message.waiting >= self.CSH_TIMEOUT_T_HELLO_PROLONG_THR_INC:
+                    new_send_prolongation_request_timer_duration = (
+                        message.waiting - self.CSH_TIMEOUT_T_HELLO_PROLONG_WAITTING_GAP
+                    )
+                    log.debug(
+                        "Calculated send_prolongation_request_timer duration %s",
+                        new_send_prolongation_request_timer_duration,
+                    )
+                    self._send_prolongation_timer.cancel()
+                    if (
+                        new_send_prolongation_request_timer_duration
+                        >= self.CSH_TIMEOUT_T_HELLO_PROLONG_MIN
+                    ):
+                        log.debug("Starting send_prolongation_timer.")
+                        self._send_prolongation_timer.reset()
+                        self._send_prolongation_timer.start(
+                            new_send_prolongation_request_timer_duration
+                        )
+                else:
+                    log.debug(
+                        "Prolongation request timer was too little, cancelling "
+                        "send_prolongation_timer."
+                    )
+                    self._send_prolongation_timer.cancel()
+            elif (
+                message.phase == CSHPhases.PENDING
+                and message.waiting is None
+                and message.prolongation_request
+            ):
+                log.debug("Remote is PENDING and requested prolongation.")
+                await self.decide_incoming_prolongation_request(message)
+                await self.send_sme_hello_update_message()
+            elif message.phase == CSHPhases.ABORTED:
+                log.debug("Remote wants to abort.")
+                return True
+            else:
+                log.debug("Unknown message pattern, abort.")
+                return True
+        return False
+
+    async def _handle_pending_timeout(self) -> bool:
+        if self._wait_for_ready_timer.has_completed():
+            log.warning("Remote was not ready in time, abort.")
+            return True
+        elif self._send_prolongation_timer.has_completed():
+            log.debug("send_prolongation_timer has expired. Requesting prolongation.")
+            await self.send_raw_csh_frame(_CSH_PROLONGATION_REQUEST_FRAME)
+
+            if self._previously_received_message:
+                timer_duration = self._previously_received_message.waiting
+            else:
+                timer_duration = datetime.timedelta(
+                    seconds=1.1 * self._wait_for_ready_timer.time_left()
+                )
+            self._prolongation_request_reply_timer.start(timer_duration)
+            self._send_prolongation_timer.reset()
+            self._current_state = self._previous_state
+        elif self._prolongation_request_reply_timer.has_completed():
+            log.debug("request_prolongation_reply_timer has expired, abort")
+            return True
+        return False
+
     async def run(self) -> None:
         abort = False
 
-        previous_state = self._current_state
+        self._previous_state = self._current_state
         while not abort and self._current_state != CSHStates.SME_HELLO_OK:
-            log.debug("Current state: %s", CSHStates(self._current_state).name)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Current state: %s", self._current_state.name)
 
             state_at_start = self._current_state
-            if self._current_state == CSHStates.SME_HELLO_STATE_READY_INIT:
-                self._wait_for_ready_timer.start(self.CSH_TIMEOUT_T_HELLO_INIT)
-                self._send_prolongation_timer.cancel()
-                self._prolongation_request_reply_timer.cancel()
-                await self.send_sme_hello_update_message()
-                self._current_state = CSHStates.SME_HELLO_STATE_READY_LISTEN
-            elif self._current_state == CSHStates.SME_HELLO_STATE_READY_LISTEN:
-                message = await self.decide_next_input()
-
-                if message:
-                    if message.phase == CSHPhases.READY:
-                        log.debug(
-                            "Received READY from remote while local is ready. "
-                            "Transition to HELLO_OK."
-                        )
-                        self._current_state = CSHStates.SME_HELLO_OK
-                    elif message.phase == CSHPhases.PENDING:
-                        log.debug("Received PENDING")
-                        if message.prolongation_request:
-                            await self.decide_incoming_prolongation_request(message)
-                            await self.send_sme_hello_update_message()
-                    elif message.phase == CSHPhases.ABORTED:
-                        log.debug("Received ABORTED")
-                        abort = True
-            elif self._current_state == CSHStates.SME_HELLO_STATE_READY_TIMEOUT:
-                abort = True
-            elif self._current_state == CSHStates.SME_HELLO_STATE_PENDING_INIT:
-                self._wait_for_ready_timer.start(self.CSH_TIMEOUT_T_HELLO_INIT)
-                self._send_prolongation_timer.cancel()
-                self._prolongation_request_reply_timer.cancel()
-                await self.send_sme_hello_update_message()
-                self._current_state = CSHStates.SME_HELLO_STATE_PENDING_LISTEN
-            elif self._current_state == CSHStates.SME_HELLO_STATE_PENDING_LISTEN:
-                message = await self.decide_next_input()
-
-                if message:
-                    log.debug("Received message while PENDING_LISTEN.")
-                    if message.phase == CSHPhases.READY and message.waiting is None:
-                        log.error("Missing waiting field in message. Aborting.")
-                        abort = True
-                    elif (message.phase == CSHPhases.READY and message.waiting) or (
-                        message.phase == CSHPhases.PENDING
-                        and message.waiting
-                        and message.prolongation_request is None
-                    ):
-                        log.debug("Remote is READY and waiting. Prolongation request was accepted.")
-
-                        self._prolongation_request_reply_timer.cancel()
-                        self._prolongation_request_reply_timer = AsyncTimer()
-                        if message.phase == CSHPhases.READY and message.waiting:
-                            self._wait_for_ready_timer.cancel()
-
-                        if message.waiting >= self.CSH_TIMEOUT_T_HELLO_PROLONG_THR_INC:
-                            new_send_prolongation_request_timer_duration = (
-                                message.waiting - self.CSH_TIMEOUT_T_HELLO_PROLONG_WAITTING_GAP
-                            )
-                            log.debug(
-                                "Calculated send_prolongation_request_timer duration %s",
-                                new_send_prolongation_request_timer_duration,
-                            )
-                            self._send_prolongation_timer.cancel()
-                            if (
-                                new_send_prolongation_request_timer_duration
-                                >= self.CSH_TIMEOUT_T_HELLO_PROLONG_MIN
-                            ):
-                                log.debug("Starting send_prolongation_timer.")
-                                self._send_prolongation_timer = AsyncTimer()
-                                self._send_prolongation_timer.start(
-                                    new_send_prolongation_request_timer_duration
-                                )
-                        else:
-                            log.debug(
-                                "Prolongation request timer was too little, cancelling "
-                                "send_prolongation_timer."
-                            )
-                            self._send_prolongation_timer.cancel()
-                    elif (
-                        message.phase == CSHPhases.PENDING
-                        and message.waiting is None
-                        and message.prolongation_request
-                    ):
-                        log.debug("Remote is PENDING and requested prolongation.")
-                        await self.decide_incoming_prolongation_request(message)
-                        await self.send_sme_hello_update_message()
-                    elif message.phase == CSHPhases.ABORTED:
-                        log.debug("Remote wants to abort.")
-                        abort = True
-                    else:
-                        log.debug("Unknown message pattern, abort.")
-                        abort = True
-            elif self._current_state == CSHStates.SME_HELLO_STATE_PENDING_TIMEOUT:
-                if await self._wait_for_ready_timer.has_completed():
-                    log.warning("Remote was not ready in time, abort.")
-                    abort = True
-                elif await self._send_prolongation_timer.has_completed():
-                    log.debug("send_prolongation_timer has expired. Requesting prolongation.")
-                    send_message = CSHMessage(
-                        phase=CSHPhases.PENDING, prolongation_request=True, waiting=None
-                    )
-                    await self.send_csh_message(send_message)
-
-                    if self._previously_received_message:
-                        timer_duration = self._previously_received_message.waiting
-                    else:
-                        timer_duration = datetime.timedelta(
-                            seconds=1.1 * self._wait_for_ready_timer.time_left()
-                        )
-                    self._prolongation_request_reply_timer.start(timer_duration)
-                    self._send_prolongation_timer = AsyncTimer()
-                    self._current_state = previous_state
-                elif await self._prolongation_request_reply_timer.has_completed():
-                    log.debug("request_prolongation_reply_timer has expired, abort")
-                    abort = True
-            else:
+            handler = self._state_handlers.get(self._current_state)
+            if handler is None:
                 raise RuntimeError("This should not happen, at least one pattern should fit.")
+            abort = await handler()
 
-            previous_state = state_at_start
+            self._previous_state = state_at_start
 
         self._wait_for_ready_timer.cancel()
         self._send_prolongation_timer.cancel()
@@ -371,10 +463,7 @@ class CSHLayer:
 
         if abort:
             log.debug("CSH requested abort")
-            send_message = CSHMessage(
-                phase=CSHPhases.ABORTED, prolongation_request=None, waiting=None
-            )
-            await self.send_csh_message(send_message)
+            await self.send_raw_csh_frame(_CSH_ABORT_FRAME)
             raise AbortConnectionException()
         else:
             log.debug("CSH was successful.")
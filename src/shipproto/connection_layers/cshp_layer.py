@@ -1,16 +1,16 @@
 """Connection Mode Initialisation layer."""
 
-import json
+import asyncio
 import logging
 from dataclasses import dataclass
 from datetime import timedelta
 from enum import IntEnum, Enum
-from typing import Dict, Any, List, TypeVar, Generic, Optional
+from typing import Awaitable, Callable, Dict, Any, Optional, Tuple, cast
 
+from shipproto import json_codec
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
-from shipproto.finish_first import FinishFirst
 from shipproto.timer import AsyncTimer
-from shipproto.websocket import Websocket
+from shipproto.websocket import Websocket, recv_bytes
 
 log = logging.getLogger("ship")
 
@@ -40,28 +40,66 @@ class SHIPFormats(Enum):
     JSON_UTF16 = "JSON-UTF16"
 
 
-M = TypeVar("M")
+_HANDSHAKE_TYPE_BY_VALUE = cast(
+    Dict[str, CSHPProtocolHandshakeType], CSHPProtocolHandshakeType._value2member_map_
+)
+_FORMAT_BY_VALUE = cast(Dict[str, SHIPFormats], SHIPFormats._value2member_map_)
 
+_HANDSHAKE_FIELDS = frozenset({"handshakeType", "version", "formats"})
+_HANDSHAKE_ERROR_FIELDS = frozenset({"error"})
+
+
+def _merge_cshp_items(cshp_json_msg: Dict[str, Any], message_key: str) -> Dict[str, Any]:
+    """Merge the single key items of a CSHP message into one dict.
+
+    :param cshp_json_msg: The CSHP message as parsed from JSON.
+    :param message_key: The single outer key of the message, e.g. `messageProtocolHandshake`.
+    :return: The value of each item by its key.
+    """
+    fields: Dict[str, Any] = {}
+    for item in cshp_json_msg[message_key]:
+        if len(item) != 1:
+            log.error(
+                "Each item in CSHP message is expected to have a single key, "
+                "value pair. Found multiple keys %s in message %s",
+                list(item.keys()),
+                cshp_json_msg,
+            )
+            raise AbortConnectionException
+
+        key, value = next(iter(item.items()))
+        if key in fields:
+            log.error("Duplicate field %s in CSHP message %s", key, cshp_json_msg)
+            raise AbortConnectionException
+        fields[key] = value
+
+    return fields
+
+
+class CSHPMessage:
+    __slots__ = ()
 
-class CSHPMessage(Generic[M]):
     def to_json(self) -> Dict[str, Any]:
         ...
 
+    def to_wire(self) -> bytes:
+        return json_codec.dumps(self.to_json())
+
     @staticmethod
     def json_is(cshp_json_msg: Dict[str, Any]) -> bool:
         ...
 
     @staticmethod
-    def from_json(cshp_json_msg: Dict[str, Any]) -> M:
+    def from_json(cshp_json_msg: Dict[str, Any]) -> "CSHPMessage":
         ...
 
 
-@dataclass
-class CSHPProtocolHandshakeMessage(CSHPMessage["CSHPProtocolHandshakeMessage"]):
+@dataclass(slots=True, frozen=True)
+class CSHPProtocolHandshakeMessage(CSHPMessage):
     handshake_type: CSHPProtocolHandshakeType
     version_major: int
     version_minor: int
-    formats: List[SHIPFormats]
+    formats: Tuple[SHIPFormats, ...]
 
     def to_json(self) -> Dict[str, Any]:
         return {
@@ -72,62 +110,51 @@ class CSHPProtocolHandshakeMessage(CSHPMessage["CSHPProtocolHandshakeMessage"]):
             ]
         }
 
+    def to_wire(self) -> bytes:
+        # All values are enum values or integers which need no escaping, from_json rejects any
+        # other version value. So the JSON can be written directly instead of building the
+        # nested dicts of to_json first.
+        formats = ",".join(f'"{format_.value}"' for format_ in self.formats)
+        return (
+            f'{{"messageProtocolHandshake":[{{"handshakeType":"{self.handshake_type.value}"}},'
+            f'{{"version":{{"major":{self.version_major},"minor":{self.version_minor}}}}},'
+            f'{{"formats":[{{"format":[{formats}]}}]}}]}}'
+        ).encode()
+
     @staticmethod
     def json_is(cshp_json_msg: Dict[str, Any]) -> bool:
         return "messageProtocolHandshake" in cshp_json_msg
 
     @staticmethod
-    def from_json(cshp_json_msg: Dict[str, Any]) -> "CSHPMessage":
-        handshake_type = None
-        version_major = None
-        version_minor = None
-        formats = None
-
+    def from_json(cshp_json_msg: Dict[str, Any]) -> "CSHPProtocolHandshakeMessage":
         try:
-            for item in cshp_json_msg["messageProtocolHandshake"]:
-                if len(item) != 1:
-                    log.error(
-                        "Each item in CSHP message is expected to have a single key, "
-                        "value pair. Found multiple keys %s in message %s",
-                        list(item.keys()),
-                        cshp_json_msg,
-                    )
-                    raise AbortConnectionException
-
-                item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "handshakeType":
-                    handshake_type = CSHPProtocolHandshakeType(value)
-                elif key == "version":
-                    version_major = value["major"]
-                    version_minor = value["minor"]
-                elif key == "formats":
-                    formats = [SHIPFormats(format_) for format_ in value[0]["format"]]
-                else:
-                    log.error("Unexpected field %s in CSHP message %s", key, cshp_json_msg)
-                    raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
-            log.error("Could not parse CSHP message after parsing to JSON: %s", cshp_json_msg)
-            raise AbortConnectionException
-
-        def confirm_value(field_value, field_name):
-            if field_value is None:
+            fields = _merge_cshp_items(cshp_json_msg, "messageProtocolHandshake")
+            if fields.keys() != _HANDSHAKE_FIELDS:
                 log.error(
-                    f"Missing required field '{field_name}' in CSHP message %s", cshp_json_msg
+                    "Expected fields %s in CSHP message but found %s in message %s",
+                    sorted(_HANDSHAKE_FIELDS),
+                    list(fields.keys()),
+                    cshp_json_msg,
                 )
                 raise AbortConnectionException
 
-        confirm_value(handshake_type, "handshakeType")
-        confirm_value(version_major, "version.major")
-        confirm_value(version_minor, "version.minor")
-        confirm_value(formats, "formats.format")
+            handshake_type = _HANDSHAKE_TYPE_BY_VALUE[fields["handshakeType"]]
+            version = fields["version"]
+            version_major = version["major"]
+            version_minor = version["minor"]
+            # bool is a subclass of int, but true and false are not valid version numbers.
+            if type(version_major) is not int or type(version_minor) is not int:
+                raise ValueError("Version numbers must be integers")
+            formats = tuple(_FORMAT_BY_VALUE[format_] for format_ in fields["formats"][0]["format"])
+        except (KeyError, ValueError, IndexError, TypeError, AttributeError):
+            log.error("Could not parse CSHP message after parsing to JSON: %s", cshp_json_msg)
+            raise AbortConnectionException
 
         return CSHPProtocolHandshakeMessage(handshake_type, version_major, version_minor, formats)
 
 
-@dataclass
-class CSHPProtocolHandshakeErrorMessage(CSHPMessage["CSHPProtocolHandshakeErrorMessage"]):
+@dataclass(slots=True, frozen=True)
+class CSHPProtocolHandshakeErrorMessage(CSHPMessage):
     error: int
 
     def to_json(self) -> Dict[str, Any]:
@@ -139,43 +166,46 @@ class CSHPProtocolHandshakeErrorMessage(CSHPMessage["CSHPProtocolHandshakeErrorM
 
     @staticmethod
     def from_json(cshp_json_msg: Dict[str, Any]) -> "CSHPProtocolHandshakeErrorMessage":
-        error = None
-
         try:
-            for item in cshp_json_msg["messageProtocolHandshakeError"]:
-                if len(item) != 1:
-                    log.error(
-                        "Each item in CSHP message is expected to have a single key, "
-                        "value pair. Found multiple keys %s in message %s",
-                        list(item.keys()),
-                        cshp_json_msg,
-                    )
-                    raise AbortConnectionException
-
-                item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "error":
-                    error = value
-                else:
-                    log.error("Unexpected field %s in CSHP message %s", key, cshp_json_msg)
-                    raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
-            log.error("Could not parse CSHP message after parsing to JSON: %s", cshp_json_msg)
-            raise AbortConnectionException
-
-        def confirm_value(field_value, field_name):
-            if field_value is None:
+            fields = _merge_cshp_items(cshp_json_msg, "messageProtocolHandshakeError")
+            if fields.keys() != _HANDSHAKE_ERROR_FIELDS:
                 log.error(
-                    f"Missing required field '{field_value}' in CSHP message %s", cshp_json_msg
+                    "Expected fields %s in CSHP message but found %s in message %s",
+                    sorted(_HANDSHAKE_ERROR_FIELDS),
+                    list(fields.keys()),
+                    cshp_json_msg,
                 )
                 raise AbortConnectionException
 
-        confirm_value(error, "error")
+            error = fields["error"]
+        except (KeyError, TypeError, AttributeError):
+            log.error("Could not parse CSHP message after parsing to JSON: %s", cshp_json_msg)
+            raise AbortConnectionException
 
         return CSHPProtocolHandshakeErrorMessage(error)
 
 
+_CSHP_MESSAGE_PARSERS: Dict[str, Callable[[Dict[str, Any]], CSHPMessage]] = {
+    "messageProtocolHandshake": CSHPProtocolHandshakeMessage.from_json,
+    "messageProtocolHandshakeError": CSHPProtocolHandshakeErrorMessage.from_json,
+}
+
+_CLIENT_ANNOUNCE = CSHPProtocolHandshakeMessage(
+    CSHPProtocolHandshakeType.ANNOUNCE_MAX,
+    version_major=1,
+    version_minor=0,
+    formats=(SHIPFormats.JSON_UTF8,),
+)
+_SERVER_SELECT = CSHPProtocolHandshakeMessage(
+    CSHPProtocolHandshakeType.SELECT,
+    version_major=1,
+    version_minor=0,
+    formats=(SHIPFormats.JSON_UTF8,),
+)
+_ANNOUNCE_MAX_FRAME = b"\x01" + _CLIENT_ANNOUNCE.to_wire()
+_SELECT_FRAME = b"\x01" + _SERVER_SELECT.to_wire()
+
+
 class AbstractCSHPLayer:
     CSHP_TIMEOUT_WAIT = timedelta(seconds=10)
 
@@ -190,121 +220,122 @@ class AbstractCSHPLayer:
         self._wait_timer = AsyncTimer()
 
     async def send_cshp_message(self, message: CSHPMessage) -> None:
-        log.debug("Sending CSH message %s", message)
-        await self._websocket.send(b"\x01" + json.dumps(message.to_json()).encode())
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending CSHP message %s", message)
+        await self._websocket.send(b"\x01" + message.to_wire())
+
+    async def send_raw_cshp_frame(self, frame: bytes) -> None:
+        """Send a CSHP frame which is already serialized, including the message type byte."""
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending CSHP frame %s", frame)
+        await self._websocket.send(frame)
 
     async def receive_cshp_message(self) -> CSHPMessage:
-        msg = await self._websocket.recv()
+        msg = await recv_bytes(self._websocket)
 
         if len(msg) == 0:
             log.error("Received an empty CSHP message.")
             raise AbortConnectionException()
 
-        msg_type = msg[0]
-
-        if isinstance(msg_type, str):
-            msg_type = msg_type.encode()
-
-        if msg_type != 1 and msg_type != b"\x01":
-            log.error("CSHP message expected with message type 1, received %s", msg_type)
+        if msg[0] != 0x01:
+            log.error("CSHP message expected with message type 1, received %s", msg[0])
             raise AbortConnectionException()
 
         try:
-            msg_value = json.loads(msg[1:])
-        except json.JSONDecodeError:
+            msg_value = json_codec.loads(msg[1:])
+        except json_codec.JSONDecodeError:
             log.error("Could not parse CSHP message value as json. Received %s", msg[1:])
             raise AbortConnectionException()
 
-        if CSHPProtocolHandshakeMessage.json_is(msg_value):
-            message = CSHPProtocolHandshakeMessage.from_json(msg_value)
-            log.debug("Received CSHP protocol handshake message %s", message)
-        elif CSHPProtocolHandshakeErrorMessage.json_is(msg_value):
-            message = CSHPProtocolHandshakeErrorMessage.from_json(msg_value)
-            log.debug("Received CSHP protocol handshake error message %s", message)
-        else:
-            raise AbortConnectionException(f"Unknown message {msg_value}")
+        if not isinstance(msg_value, dict):
+            log.error("CSHP message value is not a JSON object. Received %s", msg[1:])
+            raise AbortConnectionException()
+
+        try:
+            message_parser = _CSHP_MESSAGE_PARSERS[next(iter(msg_value))]
+        except (StopIteration, KeyError, TypeError):
+            raise AbortConnectionException("Unknown message %s", msg_value)
+
+        message = message_parser(msg_value)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received CSHP message %s", message)
 
         return message
 
 
 class CSHPClientLayer(AbstractCSHPLayer):
     _current_state: CSHPClientStates
+    _state_handlers: Dict[CSHPClientStates, Callable[[], Awaitable[Optional[int]]]]
 
     def __init__(self, websocket: Websocket, remote_ski: str):
         super().__init__(websocket, remote_ski)
 
         self._current_state = CSHPClientStates.SME_PROT_H_STATE_CLIENT_INIT
+        self._state_handlers = {
+            CSHPClientStates.SME_PROT_H_STATE_CLIENT_INIT: self._handle_init,
+            CSHPClientStates.SME_PROT_H_STATE_CLIENT_LISTEN_CHOICE: self._handle_listen_choice,
+            CSHPClientStates.SME_PROT_H_STATE_TIMEOUT: self._handle_timeout,
+        }
 
     async def decide_next_input(self) -> Optional[CSHPMessage]:
-        finishes = {
-            "cshp_message": self.receive_cshp_message(),
-            "wait_timer": self._wait_timer.wait_until_completed(),
-        }
+        try:
+            return await asyncio.wait_for(
+                self.receive_cshp_message(), timeout=self._wait_timer.time_left()
+            )
+        except asyncio.TimeoutError:
+            log.debug("Wait_timer expired")
+            self._current_state = CSHPClientStates.SME_PROT_H_STATE_TIMEOUT
+            return None
 
-        result = await FinishFirst(finishes).run()
+    async def _handle_init(self) -> Optional[int]:
+        await self.send_raw_cshp_frame(_ANNOUNCE_MAX_FRAME)
+        self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
+        self._current_state = CSHPClientStates.SME_PROT_H_STATE_CLIENT_LISTEN_CHOICE
+        return None
 
-        message = None
-        if "cshp_message" in result:
-            message = result["cshp_message"]
+    async def _handle_listen_choice(self) -> Optional[int]:
+        maybe_msg = await self.decide_next_input()
 
-        if "wait_timer" in result:
-            log.debug("Wait_timer expired")
-            self._current_state = CSHPClientStates.SME_PROT_H_STATE_TIMEOUT
+        if type(maybe_msg) is CSHPProtocolHandshakeMessage:
+            self._wait_timer.reset()
 
-        return message
+            if (
+                maybe_msg.handshake_type != CSHPProtocolHandshakeType.SELECT
+                or maybe_msg.version_major != 1
+                or maybe_msg.version_minor != 0
+                or maybe_msg.formats != (SHIPFormats.JSON_UTF8,)
+            ):
+                return 3
+
+            await self.send_cshp_message(maybe_msg)
+            self._current_state = CSHPClientStates.SME_PROT_H_STATE_CLIENT_OK
+        elif maybe_msg is not None:
+            return 2
+
+        return None
+
+    async def _handle_timeout(self) -> Optional[int]:
+        return 1
 
     async def run(self) -> (int, int):
-        abort = False
         error_code = None
 
         log.debug("Starting CSHP as client.")
-        while not abort and self._current_state != CSHPClientStates.SME_PROT_H_STATE_CLIENT_OK:
-            log.debug("Current state: %s", CSHPClientStates(self._current_state).name)
-
-            if self._current_state == CSHPClientStates.SME_PROT_H_STATE_CLIENT_INIT:
-                await self.send_cshp_message(
-                    CSHPProtocolHandshakeMessage(
-                        CSHPProtocolHandshakeType.ANNOUNCE_MAX,
-                        version_major=1,
-                        version_minor=0,
-                        formats=[SHIPFormats.JSON_UTF8],
-                    )
-                )
-                self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
-                self._current_state = CSHPClientStates.SME_PROT_H_STATE_CLIENT_LISTEN_CHOICE
-            elif self._current_state == CSHPClientStates.SME_PROT_H_STATE_CLIENT_LISTEN_CHOICE:
-                maybe_msg = await self.decide_next_input()
-
-                if isinstance(maybe_msg, CSHPProtocolHandshakeMessage):
-                    self._wait_timer.cancel()
-                    self._wait_timer = AsyncTimer()
-
-                    if not all(
-                        [
-                            maybe_msg.handshake_type == CSHPProtocolHandshakeType.SELECT,
-                            maybe_msg.version_major == 1,
-                            maybe_msg.version_minor == 0,
-                            len(maybe_msg.formats) == 1,
-                            maybe_msg.formats[0] == SHIPFormats.JSON_UTF8,
-                        ]
-                    ):
-                        abort = True
-                        error_code = 3
-                    else:
-                        await self.send_cshp_message(maybe_msg)
-                        self._current_state = CSHPClientStates.SME_PROT_H_STATE_CLIENT_OK
-                elif maybe_msg is not None:
-                    abort = True
-                    error_code = 2
-            elif self._current_state == CSHPClientStates.SME_PROT_H_STATE_TIMEOUT:
-                abort = True
-                error_code = 1
-            else:
+        while (
+            error_code is None
+            and self._current_state != CSHPClientStates.SME_PROT_H_STATE_CLIENT_OK
+        ):
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Current state: %s", self._current_state.name)
+
+            handler = self._state_handlers.get(self._current_state)
+            if handler is None:
                 raise RuntimeError("This should not happen, at least one pattern should fit.")
+            error_code = await handler()
 
         self._wait_timer.cancel()
 
-        if abort:
+        if error_code is not None:
             log.debug("CSHP requested abort")
             send_message = CSHPProtocolHandshakeErrorMessage(error=error_code)
             await self.send_cshp_message(send_message)
@@ -317,97 +348,93 @@ class CSHPClientLayer(AbstractCSHPLayer):
 
 class CSHPServerLayer(AbstractCSHPLayer):
     _current_state: CSHPServerStates
+    _state_handlers: Dict[CSHPServerStates, Callable[[], Awaitable[Optional[int]]]]
 
     def __init__(self, websocket: Websocket, remote_ski: str):
         super().__init__(websocket, remote_ski)
 
         self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_INIT
+        self._state_handlers = {
+            CSHPServerStates.SME_PROT_H_STATE_SERVER_INIT: self._handle_init,
+            CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_PROPOSAL: self._handle_listen_proposal,
+            CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_CONFIRM: self._handle_listen_confirm,
+            CSHPServerStates.SME_PROT_H_STATE_TIMEOUT: self._handle_timeout,
+        }
 
     async def decide_next_input(self) -> Optional[CSHPMessage]:
-        finishes = {
-            "cshp_message": self.receive_cshp_message(),
-            "wait_timer": self._wait_timer.wait_until_completed(),
-        }
+        try:
+            return await asyncio.wait_for(
+                self.receive_cshp_message(), timeout=self._wait_timer.time_left()
+            )
+        except asyncio.TimeoutError:
+            log.debug("Wait_timer expired")
+            self._current_state = CSHPServerStates.SME_PROT_H_STATE_TIMEOUT
+            return None
 
-        result = await FinishFirst(finishes).run()
+    async def _handle_init(self) -> Optional[int]:
+        self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
+        self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_PROPOSAL
+        return None
 
-        message = None
-        if "cshp_message" in result:
-            message = result["cshp_message"]
+    async def _handle_listen_proposal(self) -> Optional[int]:
+        maybe_msg = await self.decide_next_input()
 
-        if "wait_timer" in result:
-            log.debug("Wait_timer expired")
-            self._current_state = CSHPServerStates.SME_PROT_H_STATE_TIMEOUT
+        if type(maybe_msg) is CSHPProtocolHandshakeMessage:
+            self._wait_timer.reset()
 
-        return message
+            if (
+                maybe_msg.handshake_type != CSHPProtocolHandshakeType.ANNOUNCE_MAX
+                or maybe_msg.version_major != 1
+                or maybe_msg.version_minor != 0
+                or SHIPFormats.JSON_UTF8 not in maybe_msg.formats
+            ):
+                return 3
+
+            await self.send_raw_cshp_frame(_SELECT_FRAME)
+            self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
+            self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_CONFIRM
+        elif maybe_msg is not None:
+            return 2
+
+        return None
+
+    async def _handle_listen_confirm(self) -> Optional[int]:
+        maybe_msg = await self.decide_next_input()
+
+        if type(maybe_msg) is CSHPProtocolHandshakeMessage:
+            self._wait_timer.reset()
+
+            if maybe_msg != _SERVER_SELECT:
+                return 3
+
+            self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_OK
+        elif maybe_msg is not None:
+            return 2
+
+        return None
+
+    async def _handle_timeout(self) -> Optional[int]:
+        return 1
 
     async def run(self) -> (int, int):
-        abort = False
         error_code = None
 
-        proposed_handshake = None
         log.debug("Starting CSHP as server.")
-        while not abort and self._current_state != CSHPServerStates.SME_PROT_H_STATE_SERVER_OK:
-            log.debug("Current state: %s", CSHPClientStates(self._current_state).name)
-
-            if self._current_state == CSHPServerStates.SME_PROT_H_STATE_SERVER_INIT:
-                self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
-                self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_PROPOSAL
-            elif self._current_state == CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_PROPOSAL:
-                maybe_msg = await self.decide_next_input()
-
-                if isinstance(maybe_msg, CSHPProtocolHandshakeMessage):
-                    self._wait_timer.cancel()
-                    self._wait_timer = AsyncTimer()
-
-                    if not all(
-                        [
-                            maybe_msg.handshake_type == CSHPProtocolHandshakeType.ANNOUNCE_MAX,
-                            maybe_msg.version_major == 1,
-                            maybe_msg.version_minor == 0,
-                            SHIPFormats.JSON_UTF8 in maybe_msg.formats,
-                        ]
-                    ):
-                        abort = True
-                        error_code = 3
-                    else:
-                        proposed_handshake = CSHPProtocolHandshakeMessage(
-                            CSHPProtocolHandshakeType.SELECT,
-                            version_major=1,
-                            version_minor=0,
-                            formats=[SHIPFormats.JSON_UTF8],
-                        )
-                        await self.send_cshp_message(proposed_handshake)
-                        self._wait_timer.start(self.CSHP_TIMEOUT_WAIT)
-                        self._current_state = (
-                            CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_CONFIRM
-                        )
-                elif maybe_msg is not None:
-                    abort = True
-                    error_code = 2
-            elif self._current_state == CSHPServerStates.SME_PROT_H_STATE_SERVER_LISTEN_CONFIRM:
-                maybe_msg = await self.decide_next_input()
-                if isinstance(maybe_msg, CSHPProtocolHandshakeMessage):
-                    self._wait_timer.cancel()
-                    self._wait_timer = AsyncTimer()
-
-                    if not maybe_msg == proposed_handshake:
-                        abort = True
-                        error_code = 3
-                    else:
-                        self._current_state = CSHPServerStates.SME_PROT_H_STATE_SERVER_OK
-                elif maybe_msg is not None:
-                    abort = True
-                    error_code = 2
-            elif self._current_state == CSHPServerStates.SME_PROT_H_STATE_TIMEOUT:
-                abort = True
-                error_code = 1
-            else:
+        while (
+            error_code is None
+            and self._current_state != CSHPServerStates.SME_PROT_H_STATE_SERVER_OK
+        ):
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug("Current state: %s", self._current_state.name)
+
+            handler = self._state_handlers.get(self._current_state)
+            if handler is None:
                 raise RuntimeError("This should not happen, at least one pattern should fit.")
+            error_code = await handler()
 
         self._wait_timer.cancel()
 
-        if abort:
+        if error_code is not None:
             log.debug("CSHP requested abort")
             send_message = CSHPProtocolHandshakeErrorMessage(error=error_code)
             await self.send_cshp_message(send_message)
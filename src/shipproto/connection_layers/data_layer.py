@@ -1,10 +1,10 @@
-import json
 import logging
 from dataclasses import dataclass
 from typing import Union, Dict, List, Optional
 
+from shipproto import json_codec
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
-from shipproto.websocket import Websocket
+from shipproto.websocket import Websocket, recv_bytes
 
 log = logging.getLogger("ship")
 
@@ -25,30 +25,33 @@ class SHIPDataConnection:
             ]
         }
 
-        await self._websocket.send(b"\x02" + json.dumps(data_msg).encode())
+        await self._websocket.send(b"\x02" + json_codec.dumps(data_msg))
 
     async def recv_data(self) -> Data:
-        data_msg_encoded = await self._websocket.recv()
+        data_msg_encoded = await recv_bytes(self._websocket)
 
         if len(data_msg_encoded) == 0:
             log.error("Received an empty Data message.")
             raise AbortConnectionException()
 
-        msg_type = data_msg_encoded[0]
-
-        if isinstance(msg_type, str):
-            msg_type = msg_type.encode()
-
-        if msg_type != 2 and msg_type != b"\x02":
-            log.error("Data message expected with message type 2, received %s", msg_type)
+        if data_msg_encoded[0] != 0x02:
+            log.error("Data message expected with message type 2, received %s", data_msg_encoded[0])
             raise AbortConnectionException()
 
         try:
-            msg_value = json.loads(data_msg_encoded[1:])
-        except json.JSONDecodeError:
+            msg_value = json_codec.loads(data_msg_encoded[1:])
+        except json_codec.JSONDecodeError:
             log.error(
                 "Could not parse CSHP message value as json. Received %s", data_msg_encoded[1:]
             )
             raise AbortConnectionException()
-        else:
-            return next(filter(lambda i: "payload" in i, msg_value["data"]))["payload"]
+
+        try:
+            for item in msg_value["data"]:
+                if "payload" in item:
+                    return item["payload"]
+        except (KeyError, TypeError):
+            pass
+
+        log.error("Data message did not contain a payload. Received %s", msg_value)
+        raise AbortConnectionException()
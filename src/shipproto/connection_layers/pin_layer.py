@@ -1,14 +1,14 @@
 """Connection Mode Initialisation layer."""
 
-import json
 import logging
 from dataclasses import dataclass
 from enum import Enum
-import re
-from typing import Dict, Any, TypeVar, Generic, Optional
+import string
+from typing import Callable, Dict, Any, Tuple, TypeVar, Generic, Optional
 
+from shipproto import json_codec
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
-from shipproto.websocket import Websocket
+from shipproto.websocket import Websocket, recv_bytes
 
 log = logging.getLogger("ship")
 
@@ -29,9 +29,14 @@ M = TypeVar("M")
 
 
 class PinMessage(Generic[M]):
+    __slots__ = ()
+
     def to_json(self) -> Dict[str, Any]:
         ...
 
+    def to_wire(self) -> bytes:
+        return json_codec.dumps(self.to_json())
+
     @staticmethod
     def json_is(pin_json_msg: Dict[str, Any]) -> bool:
         ...
@@ -41,7 +46,82 @@ class PinMessage(Generic[M]):
         ...
 
 
-@dataclass
+# The enum values need no escaping, so their JSON items are encoded once.
+_PIN_STATE_ITEMS = {state: b'{"pinState":"%s"}' % state.value.encode() for state in PinState}
+_INPUT_PERMISSION_ITEMS = {
+    permission: b'{"inputPermission":"%s"}' % permission.value.encode()
+    for permission in PinInputPermissionType
+}
+
+# Maps the key of a field in a PIN message to the dataclass field name and a parser of its value.
+_FieldParsers = Dict[str, Tuple[str, Callable[[Any], Any]]]
+
+
+def _as_is(value: Any) -> Any:
+    return value
+
+
+_PIN_STATE_FIELDS: _FieldParsers = {
+    "pinState": ("pin_state", PinState),
+    "inputPermission": ("input_permission", PinInputPermissionType),
+}
+_PIN_INPUT_FIELDS: _FieldParsers = {
+    "pin": ("pin", _as_is),
+}
+_PIN_ERROR_FIELDS: _FieldParsers = {
+    "error": ("error", _as_is),
+}
+
+
+def _parse_pin_fields(
+    pin_json_msg: Dict[str, Any],
+    message_key: str,
+    field_parsers: _FieldParsers,
+    required: Tuple[str, ...],
+) -> Dict[str, Any]:
+    """Parse the items of a PIN message into the keyword arguments of its dataclass.
+
+    :param pin_json_msg: The PIN message as parsed from JSON.
+    :param message_key: The single outer key of the message, e.g. `connectionPinState`.
+    :param field_parsers: The dataclass field name and value parser for each expected item key.
+    :param required: The item keys which must be present in the message.
+    :return: The value of each dataclass field, None for optional fields which are missing.
+    """
+    fields: Dict[str, Any] = {field_name: None for field_name, _ in field_parsers.values()}
+
+    try:
+        for item in pin_json_msg[message_key]:
+            if len(item) != 1:
+                log.error(
+                    "Each item in PIN message is expected to have a single key, "
+                    "value pair. Found multiple keys %s in message %s",
+                    list(item.keys()),
+                    pin_json_msg,
+                )
+                raise AbortConnectionException
+
+            item: Dict[str, Any]
+            key, value = next(iter(item.items()))
+            field = field_parsers.get(key)
+            if field is None:
+                log.error("Unexpected field %s in PIN message %s", key, pin_json_msg)
+                raise AbortConnectionException
+
+            field_name, parse_value = field
+            fields[field_name] = parse_value(value)
+    except (KeyError, ValueError, IndexError, TypeError, AttributeError):
+        log.error("Could not parse PIN message after parsing to JSON: %s", pin_json_msg)
+        raise AbortConnectionException
+
+    for key in required:
+        if fields[field_parsers[key][0]] is None:
+            log.error("Missing required field '%s' in PIN message %s", key, pin_json_msg)
+            raise AbortConnectionException
+
+    return fields
+
+
+@dataclass(slots=True)
 class PinStateMessage(PinMessage["PinStateMessage"]):
     pin_state: PinState
     input_permission: Optional[PinInputPermissionType]
@@ -58,61 +138,36 @@ class PinStateMessage(PinMessage["PinStateMessage"]):
 
         return msg
 
+    def to_wire(self) -> bytes:
+        wire = b'{"connectionPinState":[' + _PIN_STATE_ITEMS[self.pin_state]
+        if self.input_permission:
+            wire += b"," + _INPUT_PERMISSION_ITEMS[self.input_permission]
+        return wire + b"]}"
+
     @staticmethod
     def json_is(pin_json_msg: Dict[str, Any]) -> bool:
         return "connectionPinState" in pin_json_msg
 
     @staticmethod
     def from_json(pin_json_msg: Dict[str, Any]) -> "PinStateMessage":
-        pin_state = None
-        input_permission = None
-
-        try:
-            for item in pin_json_msg["connectionPinState"]:
-                if len(item) != 1:
-                    log.error(
-                        "Each item in PIN message is expected to have a single key, "
-                        "value pair. Found multiple keys %s in message %s",
-                        list(item.keys()),
-                        pin_json_msg,
-                    )
-                    raise AbortConnectionException
-
-                item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "pinState":
-                    pin_state = PinState(value)
-                elif key == "inputPermission":
-                    input_permission = PinInputPermissionType(value)
-                else:
-                    log.error("Unexpected field %s in PIN message %s", key, pin_json_msg)
-                    raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
-            log.error("Could not parse PIN message after parsing to JSON: %s", pin_json_msg)
-            raise AbortConnectionException
-
-        def confirm_value(field_value, field_name):
-            if field_value is None:
-                log.error(f"Missing required field '{field_name}' in PIN message %s", pin_json_msg)
-                raise AbortConnectionException
-
-        confirm_value(pin_state, "pinState")
-
-        return PinStateMessage(pin_state, input_permission)
+        fields = _parse_pin_fields(
+            pin_json_msg, "connectionPinState", _PIN_STATE_FIELDS, required=("pinState",)
+        )
+        return PinStateMessage(**fields)
 
 
-@dataclass
+@dataclass(slots=True)
 class PinInputMessage(PinMessage["PinInputMessage"]):
-    PIN_REGEX = re.compile(r"[0-9a-fA-F]{8,16}")
     pin: str
 
     def __init__(self, pin):
-        if PinInputMessage.PIN_REGEX.fullmatch(pin):
+        # A PIN is 8 to 16 hexadecimal characters. Stripping all hex digits leaves nothing behind
+        # only if every character is one.
+        if 8 <= len(pin) <= 16 and not pin.strip(string.hexdigits):
             self.pin = pin
         else:
             raise ValueError(
-                f"PIN was unsupported. Should conform to {PinInputMessage.PIN_REGEX.pattern} but found {pin}."
+                f"PIN was unsupported. Should be 8 to 16 hexadecimal characters but found {pin}."
             )
 
     def to_json(self) -> Dict[str, Any]:
@@ -128,42 +183,13 @@ class PinInputMessage(PinMessage["PinInputMessage"]):
 
     @staticmethod
     def from_json(pin_json_msg: Dict[str, Any]) -> "PinInputMessage":
-        pin = None
+        fields = _parse_pin_fields(
+            pin_json_msg, "connectionPinInput", _PIN_INPUT_FIELDS, required=("pin",)
+        )
+        return PinInputMessage(**fields)
 
-        try:
-            for item in pin_json_msg["connectionPinInput"]:
-                if len(item) != 1:
-                    log.error(
-                        "Each item in PIN message is expected to have a single key, "
-                        "value pair. Found multiple keys %s in message %s",
-                        list(item.keys()),
-                        pin_json_msg,
-                    )
-                    raise AbortConnectionException
-
-                item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "pin":
-                    pin = value
-                else:
-                    log.error("Unexpected field %s in PIN message %s", key, pin_json_msg)
-                    raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
-            log.error("Could not parse PIN message after parsing to JSON: %s", pin_json_msg)
-            raise AbortConnectionException
-
-        def confirm_value(field_value, field_name):
-            if field_value is None:
-                log.error(f"Missing required field '{field_name}' in PIN message %s", pin_json_msg)
-                raise AbortConnectionException
-
-        confirm_value(pin, "pin")
 
-        return PinInputMessage(pin)
-
-
-@dataclass
+@dataclass(slots=True)
 class PinErrorMessage(PinMessage["PinErrorMessage"]):
     error: int
 
@@ -183,39 +209,19 @@ class PinErrorMessage(PinMessage["PinErrorMessage"]):
 
     @staticmethod
     def from_json(pin_json_msg: Dict[str, Any]) -> "PinErrorMessage":
-        error = None
+        fields = _parse_pin_fields(
+            pin_json_msg, "connectionPinError", _PIN_ERROR_FIELDS, required=("error",)
+        )
+        return PinErrorMessage(**fields)
 
-        try:
-            for item in pin_json_msg["connectionPinError"]:
-                if len(item) != 1:
-                    log.error(
-                        "Each item in PIN message is expected to have a single key, "
-                        "value pair. Found multiple keys %s in message %s",
-                        list(item.keys()),
-                        pin_json_msg,
-                    )
-                    raise AbortConnectionException
-
-                item: Dict[str, Any]
-                key = next(iter(item))
-                value = item[key]
-                if key == "error":
-                    error = value
-                else:
-                    log.error("Unexpected field %s in PIN message %s", key, pin_json_msg)
-                    raise AbortConnectionException
-        except (KeyError, ValueError, IndexError):
-            log.error("Could not parse PIN message after parsing to JSON: %s", pin_json_msg)
-            raise AbortConnectionException
 
-        def confirm_value(field_value, field_name):
-            if field_value is None:
-                log.error(f"Missing required field '{field_name}' in PIN message %s", pin_json_msg)
-                raise AbortConnectionException
+_PIN_MESSAGE_PARSERS: Dict[str, Callable[[Dict[str, Any]], PinMessage]] = {
+    "connectionPinState": PinStateMessage.from_json,
+    "connectionPinInput": PinInputMessage.from_json,
+    "connectionPinError": PinErrorMessage.from_json,
+}
 
-        confirm_value(error, "error")
-
-        return PinErrorMessage(error)
+_PIN_NONE_FRAME = b"\x01" + PinStateMessage(PinState.NONE, None).to_wire()
 
 
 class PinLayer:
@@ -227,49 +233,52 @@ class PinLayer:
         self._remote_ski = remote_ski
 
     async def send_pin_message(self, message: PinMessage) -> None:
-        log.debug("Sending PIN message %s", message)
-        await self._websocket.send(b"\x01" + json.dumps(message.to_json()).encode())
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending PIN message %s", message)
+        await self._websocket.send(b"\x01" + message.to_wire())
+
+    async def send_raw_pin_frame(self, frame: bytes) -> None:
+        """Send a PIN frame which is already serialized, including the message type byte."""
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Sending PIN frame %s", frame)
+        await self._websocket.send(frame)
 
     async def receive_pin_message(self) -> PinMessage:
-        msg = await self._websocket.recv()
+        msg = await recv_bytes(self._websocket)
 
         if len(msg) == 0:
             log.error("Received an empty PIN message.")
             raise AbortConnectionException()
 
-        msg_type = msg[0]
-
-        if isinstance(msg_type, str):
-            msg_type = msg_type.encode()
-
-        if msg_type != 1 and msg_type != b"\x01":
-            log.error("PIN message expected with message type 1, received %s", msg_type)
+        if msg[0] != 0x01:
+            log.error("PIN message expected with message type 1, received %s", msg[0])
             raise AbortConnectionException()
 
         try:
-            msg_value = json.loads(msg[1:])
-        except json.JSONDecodeError:
+            msg_value = json_codec.loads(msg[1:])
+        except json_codec.JSONDecodeError:
             log.error("Could not parse PIN message value as json. Received %s", msg[1:])
             raise AbortConnectionException()
 
-        if PinStateMessage.json_is(msg_value):
-            message = PinStateMessage.from_json(msg_value)
-            log.debug("Received PIN state message %s", message)
-        elif PinInputMessage.json_is(msg_value):
-            message = PinInputMessage.from_json(msg_value)
-            log.debug("Received PIN input message %s", message)
-        elif PinErrorMessage.json_is(msg_value):
-            message = PinErrorMessage.from_json(msg_value)
-            log.debug("Received PIN error message %s", message)
-        else:
-            raise AbortConnectionException(f"Unknown message {msg_value}")
+        if not isinstance(msg_value, dict):
+            log.error("PIN message value is not a JSON object. Received %s", msg[1:])
+            raise AbortConnectionException()
+
+        try:
+            message_parser = _PIN_MESSAGE_PARSERS[next(iter(msg_value))]
+        except (StopIteration, KeyError, TypeError):
+            raise AbortConnectionException("Unknown message %s", msg_value)
+
+        message = message_parser(msg_value)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("Received PIN message %s", message)
 
         return message
 
     async def run(self) -> None:
         log.debug("Starting PIN")
 
-        await self.send_pin_message(PinStateMessage(PinState.NONE, None))
+        await self.send_raw_pin_frame(_PIN_NONE_FRAME)
         remote_init_msg = await self.receive_pin_message()
 
         if (
@@ -280,4 +289,4 @@ class PinLayer:
                 "Other side has PIN requirements and this library does not support that."
             )
         elif not isinstance(remote_init_msg, PinStateMessage):
-            raise AbortConnectionException(f"Received unknown message {remote_init_msg}")
+            raise AbortConnectionException("Received unknown message %s", remote_init_msg)
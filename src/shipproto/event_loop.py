@@ -0,0 +1,21 @@
+"""Running the SHIP entrypoints on the fastest available event loop.
+
+Uses uvloop when it is installed and falls back to the stdlib asyncio event loop otherwise.
+"""
+
+import asyncio
+from typing import Any, Coroutine, TypeVar, cast
+
+T = TypeVar("T")
+
+try:
+    import uvloop  # type: ignore[import]
+except ImportError:  # pragma: no cover
+    uvloop = None  # type: ignore[assignment]
+
+
+def run(main: Coroutine[Any, Any, T]) -> T:
+    if uvloop is not None:
+        # uvloop.run was added in 0.18.
+        return cast(T, uvloop.run(main))
+    return asyncio.run(main)
@@ -3,6 +3,7 @@
 # https://www.electricmonk.nl/log/2018/06/02/ssl-tls-client-certificate-verification-with-python-v3-4-sslcontext/
 
 import asyncio
+import os
 import ssl
 import sys
 from typing import Coroutine
@@ -11,6 +12,7 @@ import websockets
 
 import logging
 
+from shipproto import event_loop
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
 from shipproto.connection_layers.cmi_layer import CMILayerClient
 from shipproto.connection_layers.csh_layer import CSHLayer
@@ -19,23 +21,13 @@ from shipproto.connection_layers.data_layer import SHIPDataConnection
 from shipproto.connection_layers.pin_layer import PinLayer
 from shipproto.trust_manager import TrustManager
 
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter(
-    fmt="%(asctime)s [%(name)s][%(filename)s:%(lineno)d][%(levelname)s]: %(message)s"
-)
-handler.setFormatter(formatter)
-root_logger.addHandler(handler)
-
 log = logging.getLogger("ship")
 
 
 async def main_tls():
-    server_cert = "/home/fleursl/Downloads/test_client_cert_ship/certificate.pem"
-    server_key = "/home/fleursl/Downloads/test_client_cert_ship/privatekey.pem"
-    client_cert = server_cert
-    client_key = server_key
+    server_cert = os.environ.get("SHIP_SERVER_CERT", "certificate.pem")
+    client_cert = os.environ.get("SHIP_CLIENT_CERT", server_cert)
+    client_key = os.environ.get("SHIP_CLIENT_KEY", "privatekey.pem")
 
     ssl_context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=server_cert)
     ssl_context.load_cert_chain(certfile=client_cert, keyfile=client_key)
@@ -84,4 +76,14 @@ async def main_sme():
             await websocket.close()
 
 
-asyncio.run(main_sme())
+if __name__ == "__main__":
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(sys.stdout)
+    formatter = logging.Formatter(
+        fmt="%(relativeCreated)d [%(name)s][%(filename)s:%(lineno)d][%(levelname)s]: %(message)s"
+    )
+    handler.setFormatter(formatter)
+    root_logger.addHandler(handler)
+
+    event_loop.run(main_sme())
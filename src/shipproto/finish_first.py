@@ -1,24 +1,15 @@
 import asyncio
 from dataclasses import dataclass
-from typing import Dict, Any, Coroutine
+from typing import Dict, Any, Coroutine, Generic, Hashable, TypeVar
 
+K = TypeVar("K", bound=Hashable)
 
-@dataclass
-class FinishFirst:
-    coroutines_by_name: Dict[str, Coroutine]
-    loop: asyncio.AbstractEventLoop
-
-    def __init__(
-        self, coroutines_by_name: Dict[str, Coroutine], loop: asyncio.AbstractEventLoop = None
-    ):
-        self.coroutines_by_name = coroutines_by_name
 
-        if loop is None:
-            self.loop = asyncio.get_event_loop()
-        else:
-            self.loop = loop
+@dataclass
+class FinishFirst(Generic[K]):
+    coroutines_by_name: Dict[K, Coroutine]
 
-    async def run(self) -> Dict[str, Any]:
+    async def run(self) -> Dict[K, Any]:
         """Run the coroutines and return the results from the coroutines that finish first.
 
         Normally only a single coroutine will finish first, but in certain edge cases
@@ -27,19 +18,13 @@ class FinishFirst:
         :return: The results associated to the name of the coroutine.
         """
 
-        tasks_by_name = {
-            name: self.loop.create_task(coro) for name, coro in self.coroutines_by_name.items()
+        names_by_task = {
+            asyncio.ensure_future(coro): name for name, coro in self.coroutines_by_name.items()
         }
 
-        done, pending = await asyncio.wait(
-            tasks_by_name.values(), return_when=asyncio.FIRST_COMPLETED
-        )
+        done, pending = await asyncio.wait(names_by_task, return_when=asyncio.FIRST_COMPLETED)
 
-        result = {}
-        for task_name, task in tasks_by_name.items():
-            if task in done:
-                result[task_name] = task.result()
-            else:
-                task.cancel()
+        for task in pending:
+            task.cancel()
 
-        return result
+        return {names_by_task[task]: task.result() for task in done}
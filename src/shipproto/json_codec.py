@@ -0,0 +1,44 @@
+"""JSON encoding and decoding of SHIP message values.
+
+Uses orjson when it is installed and falls back to the stdlib json module otherwise. In both
+cases `dumps` returns the UTF-8 encoded bytes so the result can be put on the wire directly.
+
+With orjson, `dumps` accepts the same values as the stdlib: non-string dict keys are converted
+to strings and values orjson refuses, such as integers above 64 bits, are encoded by the stdlib
+instead. The remaining differences are that orjson encodes NaN and Infinity as null where the
+stdlib writes the non-standard NaN and Infinity literals, and that `loads` rejects those
+literals and integers above 64 bits. Both `loads` implementations raise JSONDecodeError on
+input which is not valid UTF-8.
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None  # type: ignore[assignment]
+
+if orjson is not None:
+    from orjson import JSONDecodeError, loads
+
+    def dumps(value: Any) -> bytes:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            return json.dumps(value).encode()
+
+else:  # pragma: no cover
+    from json import JSONDecodeError  # type: ignore[assignment]
+
+    def loads(value: bytes) -> Any:  # type: ignore[misc]
+        # Like orjson, only accept UTF-8 and report invalid UTF-8 as a JSONDecodeError, which
+        # is the only error the connection layers handle.
+        try:
+            text = value.decode()
+        except UnicodeDecodeError as exc:
+            raise JSONDecodeError(str(exc), value.decode(errors="replace"), exc.start) from exc
+        return json.loads(text)
+
+    def dumps(value: Any) -> bytes:  # type: ignore[misc]
+        return json.dumps(value).encode()
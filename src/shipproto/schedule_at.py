@@ -1,6 +1,5 @@
 import asyncio
-import datetime
-from typing import Coroutine, Awaitable, Optional
+from typing import Callable, Coroutine, Awaitable, Optional
 
 TimerCallable = Coroutine
 
@@ -8,8 +7,9 @@ TimerCallable = Coroutine
 class AsyncScheduleAt:
     _callable: TimerCallable
     _loop: asyncio.AbstractEventLoop
+    _create_task: Callable[[Coroutine], asyncio.Task]
     _async_task: asyncio.Task
-    _after: datetime.timedelta
+    _after_seconds: float
 
     def __init__(self, callable: TimerCallable, loop: asyncio.AbstractEventLoop = None):
         self._callable = callable
@@ -18,16 +18,17 @@ class AsyncScheduleAt:
             self._loop = loop
         else:
             self._loop = asyncio.get_running_loop()
+        self._create_task = self._loop.create_task
 
     def after_seconds(self, seconds: float) -> None:
-        self._after = datetime.timedelta(seconds=seconds)
+        self._after_seconds = seconds
 
     async def _run_task(self) -> None:
-        await asyncio.sleep(self._after.total_seconds())
+        await asyncio.sleep(self._after_seconds)
         await self._callable
 
     def schedule(self) -> None:
-        self._async_task = self._loop.create_task(self._run_task())
+        self._async_task = self._create_task(self._run_task())
 
     def cancel(self) -> None:
         if not self._async_task.cancelling():
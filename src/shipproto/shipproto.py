@@ -1,34 +1,28 @@
 #!/usr/bin/env python
 
 import asyncio
-import binascii
+import functools
+import multiprocessing
+import os
+import socket
 import ssl
 import sys
 from typing import Coroutine
 
-import cryptography.x509
 from websockets.server import serve, WebSocketServerProtocol
 
 import logging
 
+from shipproto import event_loop
 from shipproto.connection_layers.abstract_layer import AbortConnectionException
 from shipproto.connection_layers.cmi_layer import CMILayerServer
 from shipproto.connection_layers.csh_layer import CSHLayer
 from shipproto.connection_layers.cshp_layer import CSHPServerLayer
 from shipproto.connection_layers.data_layer import SHIPDataConnection
 from shipproto.connection_layers.pin_layer import PinLayer
+from shipproto.ski import ski_from_der_certificate
 from shipproto.trust_manager import TrustManager
 
-root_logger = logging.getLogger()
-root_logger.setLevel(logging.DEBUG)
-handler = logging.StreamHandler(sys.stdout)
-formatter = logging.Formatter(
-    fmt="%(asctime)s [%(name)s][%(filename)s:%(lineno)d][%(levelname)s]: %(message)s"
-)
-handler.setFormatter(formatter)
-root_logger.addHandler(handler)
-
-
 log = logging.getLogger("ship")
 
 
@@ -36,23 +30,27 @@ async def echo(websocket: WebSocketServerProtocol, url_path: str):
     ssl_object: ssl.SSLSocket = websocket.transport.get_extra_info("ssl_object")
     peer_cert_der = ssl_object.getpeercert(binary_form=True)
 
-    print("Received peer cert", type(peer_cert_der), peer_cert_der)
-    peer_cert = cryptography.x509.load_der_x509_certificate(peer_cert_der)
-    client_ski = cryptography.x509.SubjectKeyIdentifier.from_public_key(
-        peer_cert.public_key()
-    ).digest
-    client_ski_hex = binascii.hexlify(client_ski, sep=":").decode()
-    print("Client SKI:", client_ski_hex)
+    # The SKI is derived once, before the message loop, and a peer certificate that cannot
+    # be parsed ends the connection right away.
+    try:
+        client_ski = ski_from_der_certificate(peer_cert_der)
+    except (TypeError, ValueError, IndexError):
+        log.error("Could not determine the SKI of the peer certificate, closing connection.")
+        await websocket.close()
+        return
+
+    if log.isEnabledFor(logging.DEBUG):
+        log.debug("Received peer cert %s", peer_cert_der)
+        log.debug("Client SKI: %s", client_ski.hex(":"))
 
     async for message in websocket:
         await websocket.send(message)
 
 
 async def main_tls():
-    server_cert = "/home/fleursl/Downloads/test_client_cert_ship/certificate.pem"
-    server_key = "/home/fleursl/Downloads/test_client_cert_ship/privatekey.pem"
-    client_cert = server_cert
-    client_key = server_key
+    server_cert = os.environ.get("SHIP_SERVER_CERT", "certificate.pem")
+    server_key = os.environ.get("SHIP_SERVER_KEY", "privatekey.pem")
+    client_cert = os.environ.get("SHIP_CLIENT_CERT", server_cert)
 
     ssl_context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
     ssl_context.verify_mode = ssl.CERT_REQUIRED
@@ -71,11 +69,12 @@ async def decide_if_ski_is_trusted(ski: str, decide_to_trust: Coroutine[None, No
     await decide_to_trust
 
 
-async def ship_connection(websocket: WebSocketServerProtocol, url_path: str):
-    trust_manager = TrustManager(decide_if_ski_is_trusted)
+async def ship_connection(
+    websocket: WebSocketServerProtocol, url_path: str, trust_manager: TrustManager
+):
     try:
         if url_path != "/ship/":
-            raise AbortConnectionException(f"url_path was {url_path} but should be /ship/")
+            raise AbortConnectionException("url_path was %s but should be /ship/", url_path)
         log.debug("Starting CMI.")
         await CMILayerServer(websocket).run()
         log.debug("Finished CMI.")
@@ -101,9 +100,64 @@ async def ship_connection(websocket: WebSocketServerProtocol, url_path: str):
         await websocket.close()
 
 
-async def main_sme():
-    async with serve(ship_connection, "localhost", 8765):
+def _reuse_port_socket(host: str, port: int) -> socket.socket:
+    """Create a listening socket which other processes may bind to the same port as well.
+
+    :param host: The address to listen on.
+    :param port: The port to listen on.
+    :return: The bound and listening socket.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen()
+    return sock
+
+
+async def main_sme(reuse_port: bool = False):
+    # Shared by all connections so a remote that was trusted once is not asked about again.
+    trust_manager = TrustManager(decide_if_ski_is_trusted)
+    handler = functools.partial(ship_connection, trust_manager=trust_manager)
+    if reuse_port:
+        server = serve(handler, sock=_reuse_port_socket("localhost", 8765))
+    else:
+        server = serve(handler, "localhost", 8765)
+
+    async with server:
         await asyncio.Future()  # run forever
 
 
-asyncio.run(main_sme())
+def _configure_logging() -> None:
+    root_logger = logging.getLogger()
+    # A forked worker inherits the handler of the parent, a spawned worker starts without one.
+    if root_logger.handlers:
+        return
+
+    root_logger.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(sys.stdout)
+    formatter = logging.Formatter(
+        fmt="%(relativeCreated)d [%(name)s][%(filename)s:%(lineno)d][%(levelname)s]: %(message)s"
+    )
+    handler.setFormatter(formatter)
+    root_logger.addHandler(handler)
+
+
+def _run_worker() -> None:
+    _configure_logging()
+    event_loop.run(main_sme(reuse_port=True))
+
+
+if __name__ == "__main__":
+    _configure_logging()
+
+    # Each worker process listens on its own SO_REUSEPORT socket and the kernel spreads the
+    # incoming connections over them. Trust decisions are not shared between workers.
+    workers = int(os.environ.get("SHIP_SERVER_WORKERS", "1"))
+    if workers > 1 and hasattr(socket, "SO_REUSEPORT"):
+        processes = [multiprocessing.Process(target=_run_worker) for _ in range(workers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+    else:
+        event_loop.run(main_sme())
@@ -0,0 +1,19 @@
+"""Subject Key Identifier of a peer certificate, which SHIP uses to identify the remote."""
+
+import functools
+
+import cryptography.x509
+
+
+@functools.lru_cache(maxsize=128)
+def ski_from_der_certificate(peer_cert_der: bytes) -> bytes:
+    """Calculate the SKI of a DER encoded certificate as in RFC 5280 section 4.2.1.2 method 1.
+
+    The result is cached per certificate as the same remote usually reconnects with the same
+    certificate.
+
+    :param peer_cert_der: The certificate of the remote in DER format.
+    :return: The 20 byte SKI.
+    """
+    peer_cert = cryptography.x509.load_der_x509_certificate(peer_cert_der)
+    return cryptography.x509.SubjectKeyIdentifier.from_public_key(peer_cert.public_key()).digest
@@ -1,15 +1,12 @@
-import hashlib
+import sys
 
 import cryptography.x509
 from cryptography.hazmat.primitives import serialization
 from cryptography.x509 import Certificate
 
-with open('/home/fleursl/Downloads/test_client_cert_ship/certificate.pem', mode='rb') as \
-        open_file:
-    pubkey: Certificate = cryptography.x509.load_pem_x509_certificate(open_file.read())
+from shipproto.ski import ski_from_der_certificate
 
-print(hashlib.sha1(pubkey.public_key().public_bytes(
-            serialization.Encoding.DER,
-            serialization.PublicFormat.PKCS1,
-        )).hexdigest())
+with open(sys.argv[1], mode='rb') as open_file:
+    cert: Certificate = cryptography.x509.load_pem_x509_certificate(open_file.read())
 
+print(ski_from_der_certificate(cert.public_bytes(serialization.Encoding.DER)).hex())
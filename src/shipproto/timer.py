@@ -1,70 +1,63 @@
 import asyncio
 import datetime
-import time
-from asyncio import Task
-from typing import Literal, Optional
+from asyncio import TimerHandle
+from typing import Callable, Literal, Optional, Tuple
 
 
 class AsyncTimer:
-    _async_task: Task
+    _timer_handle: Optional[TimerHandle]
     _loop: asyncio.AbstractEventLoop
+    _loop_time: Callable[[], float]
     _event: asyncio.Event
-    _after: Optional[datetime.timedelta]
-    _at: Optional[float]
+    _deadline: Optional[float]
 
     def __init__(self, loop: asyncio.AbstractEventLoop = None):
-        self._async_task = None
+        self._timer_handle = None
         if loop:
             self._loop = loop
         else:
             self._loop = asyncio.get_running_loop()
+        self._loop_time = self._loop.time
 
         self._event = asyncio.Event()
-        self._at = None
-
-    async def _run_task(self) -> None:
-        wait_for = self._after.total_seconds()
-
-        if wait_for > 0:
-            await asyncio.sleep(wait_for)
-
-        self._event.set()
+        self._deadline = None
 
     def start(self, after: datetime.timedelta) -> None:
         if self.has_started():
             raise RuntimeError("Timer was already started!")
 
-        self._after = after
-        self._at = time.time() + after.total_seconds()
-        self._async_task = self._loop.create_task(self._run_task())
+        self._deadline = self._loop_time() + after.total_seconds()
+        self._timer_handle = self._loop.call_at(self._deadline, self._event.set)
 
     def cancel(self) -> None:
-        if self._async_task and not self._async_task.cancelling():
-            self._async_task.cancel()
+        if self._timer_handle is not None:
+            self._timer_handle.cancel()
 
-    def has_started(self) -> bool:
-        return self._at is not None
-
-    async def has_completed(self) -> bool:
-        is_set = self._event.is_set()
+    def reset(self) -> None:
+        self.cancel()
+        self._timer_handle = None
+        self._event.clear()
+        self._deadline = None
 
-        if is_set:
-            await self._async_task
+    def has_started(self) -> bool:
+        return self._deadline is not None
 
-        return is_set
+    def has_completed(self) -> bool:
+        return self._event.is_set()
 
     async def wait_until_completed(self) -> Literal[True]:
+        # The event is waited on instead of a future as the timer may not be started yet, and
+        # a cancelled timer should keep its waiters waiting rather than fail them.
         await self._event.wait()
-        await self._async_task
         return True
 
     def time_left(self) -> Optional[float]:
-        time_left = None
-        if self._at:
-            now = time.time()
-            time_left = self._at - now
+        if self._deadline is None:
+            return None
+        return self._deadline - self._loop_time()
 
-        return time_left
+    def snapshot(self) -> Tuple[bool, Optional[float]]:
+        return self._event.is_set(), self.time_left()
 
     def postpone(self, duration: datetime.timedelta) -> "AsyncTimer":
         left = self.time_left()
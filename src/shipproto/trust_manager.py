@@ -1,7 +1,5 @@
 import asyncio
 import logging
-from asyncio import Future
-from functools import partial
 from typing import Dict, Literal, Callable, Coroutine, List, Set
 
 TrustListener = Callable[[str, Coroutine[None, None, None]], Coroutine[bool, None, None]]
@@ -19,22 +17,26 @@ class TrustManager:
         self.trust_listener = trust_listener
         self._trust_tasks = {}
 
-    def _trust_task_done(self, ski: str, future: Future):
+    def _trust_task_done(self, ski: str) -> None:
         del self._trust_tasks[ski]
+        # The manager is shared by all connections, so forget an SKI which the listener did not
+        # trust. The next connection from that SKI then asks the listener again.
+        trust_event = self.trust_by_ski.get(ski)
+        if trust_event is not None and not trust_event.is_set():
+            del self.trust_by_ski[ski]
         log.debug("Trust has been processed for ski %s, decision: %s", ski, self.is_trusted(ski))
 
     def _get_trust_event(self, ski: str) -> asyncio.Event:
         trust_event = self.trust_by_ski.get(ski)
+        if trust_event is not None:
+            return trust_event
 
-        if not trust_event:
-            trust_event = asyncio.Event()
-            self.trust_by_ski[ski] = trust_event
-
-            if ski not in self._trust_tasks:
-                log.debug("Requesting to trust %s", ski)
-                trust_task = asyncio.create_task(self.trust_listener(ski, self.trust_remote(ski)))
-                self._trust_tasks[ski] = trust_task
-                trust_task.add_done_callback(partial(self._trust_task_done, ski))
+        trust_event = self.trust_by_ski[ski] = asyncio.Event()
+        if ski not in self._trust_tasks:
+            log.debug("Requesting to trust %s", ski)
+            trust_task = asyncio.create_task(self.trust_listener(ski, self.trust_remote(ski)))
+            self._trust_tasks[ski] = trust_task
+            trust_task.add_done_callback(lambda _: self._trust_task_done(ski))
 
         return trust_event
 
@@ -45,4 +47,6 @@ class TrustManager:
         return await self._get_trust_event(ski).wait()
 
     def is_trusted(self, ski: str) -> bool:
-        return self._get_trust_event(ski).is_set()
+        # Only a lookup, asking the trust listener is left to trust_remote and wait_to_trust.
+        trust_event = self.trust_by_ski.get(ski)
+        return trust_event is not None and trust_event.is_set()
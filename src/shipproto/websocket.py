@@ -1,4 +1,4 @@
-from typing import Protocol, Any, Union, Coroutine
+from typing import Protocol, Union
 
 from websockets.frames import CloseCode
 
@@ -10,5 +10,22 @@ class Websocket(Protocol):
     async def send(self, message: Union[str, bytes]) -> None:
         ...
 
-    async def close(code: int = CloseCode.NORMAL_CLOSURE, reason: str = "") -> None:
+    async def close(self, code: int = CloseCode.NORMAL_CLOSURE, reason: str = "") -> None:
         ...
+
+
+async def recv_bytes(websocket: Websocket) -> bytes:
+    """Receive the next message from the websocket as bytes.
+
+    SHIP messages are sent as binary frames. A text frame is encoded once here so the
+    connection layers only ever have to inspect bytes.
+
+    :param websocket: The websocket to receive the message from.
+    :return: The received message.
+    """
+    msg = await websocket.recv()
+
+    if isinstance(msg, str):
+        msg = msg.encode()
+
+    return msg
@@ -0,0 +1,45 @@
+import unittest
+from datetime import timedelta
+
+from shipproto.connection_layers.abstract_layer import AbortConnectionException
+from shipproto.connection_layers.csh_layer import CSHMessage, CSHPhases
+
+
+class CSHMessageTest(unittest.TestCase):
+    def test__from_json__parses_phase(self) -> None:
+        # Arrange
+        json_msg = {"connectionHello": [{"phase": "ready"}]}
+
+        # Act
+        message = CSHMessage.from_json(json_msg)
+
+        # Assert
+        self.assertEqual(CSHMessage(CSHPhases.READY, None, None), message)
+
+    def test__from_json__aborts_on_non_dict_item(self) -> None:
+        # Arrange
+        json_msg = {"connectionHello": [1]}
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            CSHMessage.from_json(json_msg)
+
+    def test__from_json__aborts_on_non_list_value(self) -> None:
+        # Arrange
+        json_msg = {"connectionHello": "ab"}
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            CSHMessage.from_json(json_msg)
+
+    def test__to_wire__sends_just_expired_waiting_as_zero(self) -> None:
+        # Arrange
+        message = CSHMessage(CSHPhases.PENDING, timedelta(microseconds=-300), None)
+
+        # Act
+        wire = message.to_wire()
+        json_msg = message.to_json()
+
+        # Assert
+        self.assertEqual(b'{"connectionHello":[{"phase":"pending"},{"waiting":0}]}', wire)
+        self.assertEqual({"connectionHello": [{"phase": "pending"}, {"waiting": 0}]}, json_msg)
@@ -0,0 +1,158 @@
+import asyncio
+import unittest
+from typing import List, Union
+
+from shipproto.connection_layers.abstract_layer import AbortConnectionException
+from shipproto.connection_layers.cshp_layer import (
+    CSHPClientLayer,
+    CSHPProtocolHandshakeErrorMessage,
+    CSHPProtocolHandshakeMessage,
+    CSHPServerLayer,
+)
+
+ANNOUNCE_MAX = (
+    b'\x01{"messageProtocolHandshake":[{"handshakeType":"announceMax"},'
+    b'{"version":{"major":1,"minor":0}},{"formats":[{"format":["JSON-UTF8"]}]}]}'
+)
+SELECT_DUPLICATE_FORMAT = (
+    b'\x01{"messageProtocolHandshake":[{"handshakeType":"SELECT"},'
+    b'{"version":{"major":1,"minor":0}},{"formats":[{"format":["JSON-UTF8","JSON-UTF8"]}]}]}'
+)
+ERROR_3 = b'\x01{"messageProtocolHandshakeError":[{"error":3}]}'
+
+
+class FakeWebsocket:
+    def __init__(self, received: List[Union[str, bytes]]):
+        self.received = received
+        self.sent: List[Union[str, bytes]] = []
+
+    async def send(self, message: Union[str, bytes]) -> None:
+        self.sent.append(message)
+
+    async def recv(self) -> Union[str, bytes]:
+        if not self.received:
+            await asyncio.Future()
+        return self.received.pop(0)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        ...
+
+
+class CSHPLayerTest(unittest.IsolatedAsyncioTestCase):
+    async def test__client_run__aborts_on_select_with_duplicate_format(self) -> None:
+        # Arrange
+        websocket = FakeWebsocket([SELECT_DUPLICATE_FORMAT])
+
+        # Act
+        with self.assertRaises(AbortConnectionException):
+            await CSHPClientLayer(websocket, "server").run()
+
+        # Assert
+        self.assertEqual([ANNOUNCE_MAX, ERROR_3], websocket.sent)
+
+    async def test__server_run__aborts_on_confirm_with_duplicate_format(self) -> None:
+        # Arrange
+        websocket = FakeWebsocket([ANNOUNCE_MAX, SELECT_DUPLICATE_FORMAT])
+
+        # Act
+        with self.assertRaises(AbortConnectionException):
+            await CSHPServerLayer(websocket, "client").run()
+
+        # Assert
+        self.assertEqual(ERROR_3, websocket.sent[-1])
+
+    async def test__server_run__accepts_matching_confirm(self) -> None:
+        # Arrange
+        select = ANNOUNCE_MAX.replace(b"announceMax", b"SELECT")
+        websocket = FakeWebsocket([ANNOUNCE_MAX, select])
+
+        # Act
+        version = await CSHPServerLayer(websocket, "client").run()
+
+        # Assert
+        self.assertEqual((1, 0), version)
+        self.assertEqual([select], websocket.sent)
+
+    def test__from_json__keeps_formats_in_order_with_duplicates(self) -> None:
+        # Arrange
+        json_msg = {
+            "messageProtocolHandshake": [
+                {"handshakeType": "SELECT"},
+                {"version": {"major": 1, "minor": 0}},
+                {"formats": [{"format": ["JSON-UTF8", "JSON-UTF8"]}]},
+            ]
+        }
+
+        # Act
+        message = CSHPProtocolHandshakeMessage.from_json(json_msg)
+
+        # Assert
+        self.assertEqual(2, len(message.formats))
+
+    def test__from_json__aborts_on_item_with_multiple_keys(self) -> None:
+        # Arrange
+        json_msg = {
+            "messageProtocolHandshake": [
+                {"handshakeType": "SELECT", "version": {"major": 1, "minor": 0}},
+                {"formats": [{"format": ["JSON-UTF8"]}]},
+            ]
+        }
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            CSHPProtocolHandshakeMessage.from_json(json_msg)
+
+    def test__from_json__aborts_on_duplicate_field(self) -> None:
+        # Arrange
+        json_msg = {
+            "messageProtocolHandshake": [
+                {"handshakeType": "SELECT"},
+                {"handshakeType": "announceMax"},
+                {"version": {"major": 1, "minor": 0}},
+                {"formats": [{"format": ["JSON-UTF8"]}]},
+            ]
+        }
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            CSHPProtocolHandshakeMessage.from_json(json_msg)
+
+    def test__error_from_json__aborts_on_item_with_multiple_keys(self) -> None:
+        # Arrange
+        json_msg = {"messageProtocolHandshakeError": [{"error": 3, "reason": "x"}]}
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            CSHPProtocolHandshakeErrorMessage.from_json(json_msg)
+
+    async def test__receive_cshp_message__accepts_leading_whitespace(self) -> None:
+        # Arrange
+        websocket = FakeWebsocket([b"\x01 \n" + ERROR_3[1:]])
+
+        # Act
+        message = await CSHPServerLayer(websocket, "client").receive_cshp_message()
+
+        # Assert
+        self.assertEqual(CSHPProtocolHandshakeErrorMessage(3), message)
+
+    async def test__receive_cshp_message__aborts_on_non_object_value(self) -> None:
+        # Arrange
+        websocket = FakeWebsocket([b'\x01["messageProtocolHandshakeError"]'])
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            await CSHPServerLayer(websocket, "client").receive_cshp_message()
+
+    async def test__client_run__aborts_on_select_with_bool_version(self) -> None:
+        # Arrange
+        select = ANNOUNCE_MAX.replace(b"announceMax", b"SELECT").replace(
+            b'"major":1,"minor":0', b'"major":true,"minor":false'
+        )
+        websocket = FakeWebsocket([select])
+
+        # Act
+        with self.assertRaises(AbortConnectionException):
+            await CSHPClientLayer(websocket, "server").run()
+
+        # Assert
+        self.assertEqual([ANNOUNCE_MAX], websocket.sent)
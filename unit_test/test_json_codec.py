@@ -0,0 +1,42 @@
+import importlib
+import importlib.util
+import json
+import sys
+import unittest
+from unittest import mock
+
+from shipproto import json_codec
+
+
+class JsonCodecTest(unittest.TestCase):
+    def _check_codec(self) -> None:
+        # Arrange
+        value = {1: "int key", "big": 2**70, "nested": [True, None, 1.5]}
+
+        # Act
+        encoded = json_codec.dumps(value)
+
+        # Assert
+        self.assertIsInstance(encoded, bytes)
+        self.assertEqual(json.loads(json.dumps(value)), json.loads(encoded))
+        self.assertEqual({"a": [1, "b"]}, json_codec.loads(b' {"a": [1, "b"]}'))
+        with self.assertRaises(json_codec.JSONDecodeError):
+            json_codec.loads(b"{")
+        with self.assertRaises(json_codec.JSONDecodeError):
+            json_codec.loads(b'{"a": "\xff"}')
+        with self.assertRaises(TypeError):
+            json_codec.dumps({"unserializable": object()})
+
+    def test__codec__with_orjson(self) -> None:
+        if importlib.util.find_spec("orjson") is None:
+            self.skipTest("orjson is not installed")
+        self._check_codec()
+
+    def test__codec__without_orjson(self) -> None:
+        try:
+            with mock.patch.dict(sys.modules, {"orjson": None}):
+                importlib.reload(json_codec)
+                self.assertIsNone(json_codec.orjson)
+                self._check_codec()
+        finally:
+            importlib.reload(json_codec)
@@ -0,0 +1,25 @@
+import unittest
+
+from shipproto.connection_layers.abstract_layer import AbortConnectionException
+from shipproto.connection_layers.pin_layer import PinState, PinStateMessage
+
+
+class PinStateMessageTest(unittest.TestCase):
+    def test__from_json__parses_pin_state(self) -> None:
+        # Arrange
+        json_msg = {"connectionPinState": [{"pinState": "none"}]}
+
+        # Act
+        message = PinStateMessage.from_json(json_msg)
+
+        # Assert
+        self.assertEqual(PinState.NONE, message.pin_state)
+        self.assertIsNone(message.input_permission)
+
+    def test__from_json__aborts_on_non_dict_item(self) -> None:
+        # Arrange
+        json_msg = {"connectionPinState": [1]}
+
+        # Act / Assert
+        with self.assertRaises(AbortConnectionException):
+            PinStateMessage.from_json(json_msg)
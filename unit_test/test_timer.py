@@ -0,0 +1,121 @@
+import asyncio
+import datetime
+import unittest
+
+from shipproto.timer import AsyncTimer
+
+SHORT = datetime.timedelta(milliseconds=20)
+LONG = datetime.timedelta(seconds=10)
+
+
+class AsyncTimerTest(unittest.IsolatedAsyncioTestCase):
+    async def test__start__fires_after_duration(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+
+        # Act
+        timer.start(SHORT)
+        completed = await asyncio.wait_for(timer.wait_until_completed(), timeout=1)
+
+        # Assert
+        self.assertTrue(completed)
+        self.assertTrue(timer.has_completed())
+
+    async def test__start__raises_when_already_started(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+        timer.start(LONG)
+
+        # Act / Assert
+        with self.assertRaises(RuntimeError):
+            timer.start(LONG)
+        timer.cancel()
+
+    async def test__cancel__before_deadline_does_not_fire(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+        timer.start(SHORT)
+
+        # Act
+        timer.cancel()
+        await asyncio.sleep(SHORT.total_seconds() * 2)
+
+        # Assert
+        self.assertFalse(timer.has_completed())
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(timer.wait_until_completed(), timeout=0.01)
+
+    async def test__reset__after_firing_clears_and_rearms(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+        timer.start(SHORT)
+        await asyncio.wait_for(timer.wait_until_completed(), timeout=1)
+
+        # Act
+        timer.reset()
+        cleared = (timer.has_started(), timer.has_completed(), timer.time_left())
+        timer.start(SHORT)
+        restarted_completed = timer.has_completed()
+        await asyncio.wait_for(timer.wait_until_completed(), timeout=1)
+
+        # Assert
+        self.assertEqual((False, False, None), cleared)
+        self.assertFalse(restarted_completed)
+        self.assertTrue(timer.has_completed())
+
+    async def test__time_left__counts_down_from_duration(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+
+        # Act
+        before_start = timer.snapshot()
+        timer.start(LONG)
+        completed, time_left = timer.snapshot()
+        timer.cancel()
+
+        # Assert
+        self.assertEqual((False, None), before_start)
+        self.assertFalse(completed)
+        assert time_left is not None
+        self.assertLessEqual(time_left, LONG.total_seconds())
+        self.assertGreater(time_left, LONG.total_seconds() - 1)
+
+    async def test__snapshot__after_firing_is_completed_with_no_time_left(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+        timer.start(SHORT)
+        await asyncio.wait_for(timer.wait_until_completed(), timeout=1)
+
+        # Act
+        completed, time_left = timer.snapshot()
+
+        # Assert
+        self.assertTrue(completed)
+        assert time_left is not None
+        self.assertLessEqual(time_left, 0)
+
+    async def test__postpone__returns_timer_with_extended_deadline(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+        timer.start(SHORT)
+
+        # Act
+        postponed = timer.postpone(LONG)
+        await asyncio.sleep(SHORT.total_seconds() * 2)
+        time_left = postponed.time_left()
+        postponed.cancel()
+
+        # Assert
+        self.assertFalse(timer.has_completed())
+        self.assertFalse(postponed.has_completed())
+        assert time_left is not None
+        self.assertGreater(time_left, LONG.total_seconds() - 1)
+        self.assertLessEqual(time_left, (LONG + SHORT).total_seconds())
+
+    async def test__postpone__raises_when_not_started(self) -> None:
+        # Arrange
+        timer = AsyncTimer()
+
+        # Act / Assert
+        with self.assertRaises(RuntimeError):
+            timer.postpone(LONG)
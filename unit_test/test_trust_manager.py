@@ -0,0 +1,54 @@
+import asyncio
+import unittest
+from typing import Coroutine, List
+
+from shipproto.trust_manager import TrustManager
+
+
+class TrustManagerTest(unittest.IsolatedAsyncioTestCase):
+    async def test__wait_to_trust__asks_again_after_listener_declined(self) -> None:
+        # Arrange
+        decisions: List[str] = []
+
+        async def decline_then_trust(
+            ski: str, decide_to_trust: Coroutine[None, None, None]
+        ) -> None:
+            decisions.append(ski)
+            if len(decisions) == 1:
+                decide_to_trust.close()
+            else:
+                await decide_to_trust
+
+        trust_manager = TrustManager(decline_then_trust)
+
+        # Act
+        with self.assertRaises(asyncio.TimeoutError):
+            await asyncio.wait_for(trust_manager.wait_to_trust("ab:cd"), timeout=0.05)
+        first_connection_trusted = trust_manager.is_trusted("ab:cd")
+        second_connection = await asyncio.wait_for(
+            trust_manager.wait_to_trust("ab:cd"), timeout=0.05
+        )
+
+        # Assert
+        self.assertFalse(first_connection_trusted)
+        self.assertTrue(second_connection)
+        self.assertTrue(trust_manager.is_trusted("ab:cd"))
+        self.assertEqual(["ab:cd", "ab:cd"], decisions)
+
+    async def test__wait_to_trust__remembers_trusted_ski(self) -> None:
+        # Arrange
+        decisions: List[str] = []
+
+        async def trust(ski: str, decide_to_trust: Coroutine[None, None, None]) -> None:
+            decisions.append(ski)
+            await decide_to_trust
+
+        trust_manager = TrustManager(trust)
+
+        # Act
+        await trust_manager.wait_to_trust("ab:cd")
+        await asyncio.sleep(0)
+        await trust_manager.wait_to_trust("ab:cd")
+
+        # Assert
+        self.assertEqual(["ab:cd"], decisions)